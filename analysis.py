@@ -1,124 +1,533 @@
+import codecs
+import io
+import mmap
+import os
 import re
+import numpy as np
 import pandas as pd
 from collections import Counter
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from pandas.api.types import union_categoricals
+
+from features import extract_features, style_from_features
+from instrumentation import span
+from rule_engine import load_rule_engine
+from typing import Dict, Iterable, Iterator, List, Optional
 
 
 # -----------------------------
 # 1. 카카오톡 파싱 
 # -----------------------------
-def parse_kakao_chat(text: str, my_name: str) -> pd.DataFrame:
+
+# 기존 카톡 공식 내보내기 포맷
+# 예: 2023. 5. 12. 오후 3:21, 고주성 : 안녕
+pattern_export = re.compile(
+    r"(\d{4}\. \d{1,2}\. \d{1,2}\. (?:오전|오후) \d{1,2}:\d{2}), (.*) : (.*)"
+)
+
+# 새로운 "복붙형" 카톡 포맷
+# 예: [유채린] [오후 8:48] 사진
+pattern_bracket = re.compile(
+    r"^\[(?P<speaker>.*?)\]\s*\[(?P<time>.*?)\]\s*(?P<message>.*)$"
+)
+
+# 메시지가 아닌 줄 (날짜 구분선, 입장/퇴장 같은 시스템 메시지)
+# 예: --------------- 2023년 5월 12일 금요일 ---------------
+# 예: 2023. 5. 12. 오후 3:21, 유채린님이 들어왔습니다.
+pattern_date_line = re.compile(
+    r"^-*\s*(\d{4})년 (\d{1,2})월 (\d{1,2})일 \S+요일\s*-*$"
+)
+pattern_system = re.compile(
+    r"^\d{4}\. \d{1,2}\. \d{1,2}\. (?:오전|오후) \d{1,2}:\d{2}(?:,|$)"
+)
+
+# 시각 문자열 (공식 포맷 그대로, 복붙형은 날짜 구분선의 날짜를 앞에 붙여서 같은 모양으로 맞춤)
+pattern_stamp = re.compile(
+    r"^(\d{4})\. (\d{1,2})\. (\d{1,2})\. (오전|오후) (\d{1,2}):(\d{2})$"
+)
+
+# 파싱 결과가 달라지는 변경을 하면 올려 주세요 (파싱 캐시 키에 포함됨)
+PARSER_VERSION = "3"
+
+CHAT_COLUMNS = ["datetime", "speaker", "message", "format"]
+CHAT_FORMATS = ["export", "bracket"]
+
+# 한 번에 읽는 바이트 수 / 한 배치에 담는 메시지 수
+READ_CHUNK_BYTES = 1 << 20
+DEFAULT_BATCH_SIZE = 50_000
+
+UTF8_BOM = codecs.BOM_UTF8
+# UTF-8 로 판단하기 전에 최소한 볼 바이트 수 (CP949 한 글자가 우연히 올바른 UTF-8 이 되는 경우가 있음)
+ENCODING_SNIFF_BYTES = 4096
+
+
+def detect_encoding(head: bytes, final: bool = True) -> Optional[str]:
     """
-    카카오톡 txt 파일 문자열을 받아 DataFrame으로 변환
-    반환 컬럼: [datetime, speaker, message]
+    파일 앞부분 바이트로 인코딩 추정
+    UTF-8 BOM → utf-8-sig, UTF-8로 안 읽히면 CP949 (윈도우 PC 카톡 내보내기)
+    final=False 면 바이트가 ENCODING_SNIFF_BYTES 보다 적거나 끝에서 잘린 멀티바이트 문자가 남을 때 None
+    (CP949 첫 바이트일 수도 있으므로 뒤 바이트까지 보고 판단)
     """
-    lines = text.splitlines()
-    records = []
+    if head.startswith(UTF8_BOM):
+        return "utf-8-sig"
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(head, final=final)
+    except UnicodeDecodeError:
+        return "cp949"
+    if not final and (decoder.getstate()[0] or len(head) < ENCODING_SNIFF_BYTES):
+        return None
+    return "utf-8"
 
-    # 기존 카톡 공식 내보내기 포맷
-    # 예: 2023. 5. 12. 오후 3:21, 고주성 : 안녕
-    pattern_export = re.compile(
-        r"(\d{4}\. \d{1,2}\. \d{1,2}\. (?:오전|오후) \d{1,2}:\d{2}), (.*) : (.*)"
-    )
 
-    # 새로운 "복붙형" 카톡 포맷
-    # 예: [유채린] [오후 8:48] 사진
-    pattern_bracket = re.compile(
-        r"^\[(?P<speaker>.*?)\]\s*\[(?P<time>.*?)\]\s*(?P<message>.*)$"
-    )
+def _open_source(source):
+    """
+    str(대화 내용) / bytes / 파일 경로(Path) / 파일 객체 를 받아
+    (텍스트 여부, 스트림, 닫아야 하는지) 반환
+    """
+    if isinstance(source, str):
+        return True, io.StringIO(source), False
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return False, io.BytesIO(source), False
+    if isinstance(source, os.PathLike):
+        return False, open(source, "rb"), True
+    if isinstance(source, io.TextIOBase):
+        return True, source, False
+    return False, source, False
+
+
+def iter_kakao_lines(source, read_size: int = READ_CHUNK_BYTES) -> Iterator[str]:
+    """
+    입력을 조금씩 읽어서 한 줄씩 반환 (전체 파일을 메모리에 올리지 않음)
+    바이트 입력은 UTF-8(BOM 포함) / CP949 를 자동으로 구분해서 디코딩
+    """
+    is_text, stream, should_close = _open_source(source)
+
+    try:
+        decoder = None
+        carry = ""
+        # 인코딩을 정하기 전까지 모아 둔 바이트 (청크 경계에서 잘린 문자 때문에 판단을 미룬 경우)
+        pending = b""
+
+        while True:
+            chunk = stream.read(read_size)
+            if not chunk:
+                break
+
+            if not is_text:
+                if decoder is None:
+                    pending += chunk
+                    if pending.isascii():
+                        # 아직 인코딩을 구분할 수 없는 구간 (영문/숫자만)
+                        chunk, pending = pending.decode("ascii"), b""
+                    else:
+                        encoding = detect_encoding(pending, final=False)
+                        if encoding is None:
+                            continue
+                        decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+                        chunk, pending = decoder.decode(pending), b""
+                else:
+                    chunk = decoder.decode(chunk)
+
+            pieces = (carry + chunk).splitlines(True)
+            # 마지막 줄은 다음 청크와 이어질 수 있으므로 보관
+            carry = pieces.pop() if pieces and not pieces[-1].endswith(("\n", "\r")) else ""
+            for piece in pieces:
+                yield piece
+
+        if pending:
+            # 파일 끝까지 판단을 미룬 경우 남은 바이트 전체로 결정
+            decoder = codecs.getincrementaldecoder(detect_encoding(pending))(errors="ignore")
+            carry += decoder.decode(pending)
+        if decoder is not None:
+            carry += decoder.decode(b"", final=True)
+        for piece in carry.splitlines(True):
+            yield piece
+    finally:
+        if should_close:
+            stream.close()
+
+
+def match_line(line: str):
+    """
+    한 줄을 분류
+    반환: ("record", [시각, speaker, message, format]) / ("date", "2023. 5. 12.")
+          / ("break", None) / (None, None)
+    """
+    # 1) 공식 내보내기 형식 매칭
+    m1 = pattern_export.match(line)
+    if m1:
+        dt, speaker, message = m1.groups()
+        return "record", [dt, speaker.strip(), message.strip(), "export"]
+
+    # 2) 복붙형 카톡 형식 매칭
+    m2 = pattern_bracket.match(line)
+    if m2:
+        speaker = m2.group("speaker").strip()
+        t = m2.group("time").strip()
+        message = m2.group("message").strip()
+        # 날짜는 직전 날짜 구분선에서 채움 (stamp_with_day)
+        return "record", [t, speaker, message, "bracket"]
+
+    # 3) 날짜 구분선
+    m3 = pattern_date_line.match(line)
+    if m3:
+        year, month, day = m3.groups()
+        return "date", f"{year}. {int(month)}. {int(day)}."
+
+    # 4) 시스템 메시지
+    if pattern_system.match(line):
+        return "break", None
+
+    return None, None
+
+
+def stamp_with_day(record: list, day: Optional[str]) -> list:
+    """
+    복붙형 레코드의 "오후 8:48" 앞에 날짜를 붙여 공식 포맷과 같은 시각 문자열로 만듦
+    """
+    if day is not None and record[3] == "bracket":
+        record[0] = f"{day} {record[0]}"
+    return record
+
+
+def iter_kakao_batches(
+    source, batch_size: int = DEFAULT_BATCH_SIZE, day: Optional[str] = None
+) -> Iterator[List[list]]:
+    """
+    카카오톡 대화를 스트리밍으로 파싱해서 최대 batch_size 개씩 레코드 리스트로 반환
+    여러 줄짜리 메시지는 헤더 줄의 message 뒤에 줄바꿈으로 이어 붙임
+    """
+    return iter_record_batches(iter_kakao_lines(source), batch_size=batch_size, day=day)
+
+
+def iter_record_batches(
+    lines: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE, day: Optional[str] = None
+) -> Iterator[List[list]]:
+    """
+    이미 나눠진 줄들을 파싱 (iter_kakao_batches 본체)
+    day: 첫 날짜 구분선 전에 나오는 복붙형 메시지에 붙일 날짜 (이어서 파싱할 때 사용)
+    """
+    batch = []
+    pending = None
 
     for line in lines:
         line = line.strip()
         if not line:
             continue
 
-        # 1) 공식 내보내기 형식 매칭
-        m1 = pattern_export.match(line)
-        if m1:
-            dt, speaker, message = m1.groups()
-            records.append([dt, speaker.strip(), message.strip()])
-            continue
+        kind, record = match_line(line)
 
-        # 2) 복붙형 카톡 형식 매칭
-        m2 = pattern_bracket.match(line)
-        if m2:
-            speaker = m2.group("speaker").strip()
-            t = m2.group("time").strip()
-            message = m2.group("message").strip()
-            # datetime 을 일단 time 문자열만 저장 (필요시 나중에 처리 가능)
-            records.append([t, speaker, message])
+        if kind is None:
+            # 헤더가 없는 줄 → 직전 메시지의 이어지는 줄
+            if pending is not None:
+                pending[2] += "\n" + line
             continue
 
-    df = pd.DataFrame(records, columns=["datetime", "speaker", "message"])
+        if pending is not None:
+            batch.append(pending)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if kind == "date":
+            day = record
+            record = None
+
+        pending = record if record is None else stamp_with_day(record, day)
+
+    if pending is not None:
+        batch.append(pending)
+    if batch:
+        yield batch
+
+
+def iter_kakao_frames(
+    source, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    iter_kakao_batches 결과를 배치마다 타입이 정해진 DataFrame 으로 변환해서 반환
+    """
+    for batch in iter_kakao_batches(source, batch_size=batch_size):
+        yield build_chat_frame(batch)
+
+
+def parse_kakao_timestamps(stamps: pd.Series) -> pd.Series:
+    """
+    "2023. 5. 12. 오후 3:21" 형태의 시각 문자열을 datetime64 로 변환 (벡터화)
+    같은 분 단위 시각이 많이 반복되므로 고유값만 파싱해서 다시 펼침
+    날짜를 알 수 없는 복붙형 시각 ("오후 8:48") 은 NaT
+    """
+    codes, uniques = pd.factorize(stamps, sort=False)
+    parts = pd.Series(uniques, dtype=object).str.extract(pattern_stamp)
+
+    hour = parts[4].astype(float) % 12 + (parts[3] == "오후") * 12
+    parsed = pd.to_datetime(
+        pd.DataFrame({
+            "year": parts[0].astype(float),
+            "month": parts[1].astype(float),
+            "day": parts[2].astype(float),
+            "hour": hour,
+            "minute": parts[5].astype(float),
+        }),
+        errors="coerce",
+    )
+
+    # 끝에 NaT 하나를 붙여 두면 결측(code -1)도 take 한 번으로 처리됨
+    values = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+    result = values.take(codes)
+    return pd.Series(result, index=stamps.index, name="datetime")
+
+
+def build_chat_frame(records: List[list]) -> pd.DataFrame:
+    """
+    파싱된 레코드 리스트를 컬럼 타입이 정해진 DataFrame 으로 변환
+    datetime: datetime64, speaker: category, message: str, format: category(export/bracket)
+    """
+    raw = pd.DataFrame(records, columns=CHAT_COLUMNS)
+    return pd.DataFrame({
+        "datetime": parse_kakao_timestamps(raw["datetime"]),
+        "speaker": raw["speaker"].astype("category"),
+        "message": raw["message"].astype(object),
+        "format": pd.Categorical(raw["format"], categories=CHAT_FORMATS),
+    })
+
+
+def concat_chat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    배치별 DataFrame 을 합치면서 speaker 카테고리도 합침 (object 로 풀리지 않게)
+    """
+    if not frames:
+        return build_chat_frame([])
+    if len(frames) == 1:
+        return frames[0]
+
+    speaker = union_categoricals([f["speaker"] for f in frames], sort_categories=True)
+    df = pd.concat([f.drop(columns="speaker") for f in frames], ignore_index=True)
+    df.insert(1, "speaker", speaker)
     return df
 
+
+def parse_kakao_chat(source, my_name: str) -> pd.DataFrame:
+    """
+    카카오톡 txt 파일 문자열(또는 bytes / 파일 경로 / 파일 객체)을 받아 DataFrame으로 변환
+    반환 컬럼: [datetime, speaker, message, format]
+    """
+    with span("parse") as sp:
+        df = concat_chat_frames(list(iter_kakao_frames(source)))
+        sp.set(rows=len(df))
+    return df
+
+
 # -----------------------------
-# 2. 말투 스타일 분석
+# 1-1. 병렬 파싱 (대용량 내보내기용)
 # -----------------------------
-def analyze_style(df: pd.DataFrame) -> Dict:
-    messages = df["message"].astype(str)
+DEFAULT_PARALLEL_CHUNK_BYTES = 32 << 20
 
-    total = len(messages)
-    if total == 0:
-        return {}
 
-    avg_length = messages.apply(len).mean()
-    emoji_count = messages.str.count(r"[ㅋㅎㅠㅜ]").sum()
-    question_ratio = messages.str.contains(r"\?").sum() / total
-    exclam_ratio = messages.str.contains(r"!").sum() / total
+def sniff_encoding(buf, read_size: int = READ_CHUNK_BYTES) -> str:
+    """
+    iter_kakao_lines 와 같은 방식으로 (영문/숫자만 있는 구간은 건너뛰고)
+    처음 나오는 비 ASCII 청크로 인코딩 추정
+    """
+    for start in range(0, len(buf), read_size):
+        chunk = bytes(buf[start:start + read_size])
+        if not chunk.isascii():
+            # 청크 끝에서 문자가 잘렸으면 판단이 날 때까지 몇 바이트씩 더 봄
+            end = start + read_size
+            encoding = detect_encoding(chunk, final=end >= len(buf))
+            while encoding is None:
+                end += ENCODING_SNIFF_BYTES
+                encoding = detect_encoding(bytes(buf[start:end]), final=end >= len(buf))
+            return encoding
+    return "utf-8"
 
-    return {
-        "평균 문장 길이": round(avg_length, 2),
-        "이모티콘/감정표현 수": int(emoji_count),
-        "질문 비율": round(question_ratio, 3),
-        "감탄 비율": round(exclam_ratio, 3),
-    }
 
+def split_line_spans(buf, chunk_size: int, start: int = 0) -> List[tuple]:
+    """
+    buf[start:] 를 약 chunk_size 바이트씩, 줄 경계(b"\\n" 바로 뒤)에서 자른 (시작, 끝) 목록
+    CP949 의 두 번째 바이트는 0x0A 가 될 수 없어서 UTF-8 / CP949 모두 안전
+    """
+    spans = []
+    size = len(buf)
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = buf.find(b"\n", end - 1)
+            end = size if newline == -1 else newline + 1
+        spans.append((start, end))
+        start = end
+    return spans
 
-# -----------------------------
-# 3. 규칙 기반 MBTI 추정
-# -----------------------------
-def estimate_mbti(df: pd.DataFrame) -> Dict:
-    messages = df["message"].astype(str)
 
-    text = " ".join(messages)
+def parse_line_block(lines) -> tuple:
+    """
+    줄 묶음 하나를 파싱
+    반환: (head, records, closed, tail_open, n_undated, tail_day)
+      head      : 첫 헤더/구분선 앞에 나온, 이전 블록 메시지에 이어질 줄들
+      records   : 이 블록에서 시작한 메시지들
+      closed    : 블록 안에 헤더나 구분선이 하나라도 있었는지
+      tail_open : 마지막 메시지가 다음 블록 줄을 이어 받을 수 있는지
+      n_undated : 블록의 첫 날짜 구분선 앞에 나온 메시지 수 (이전 블록 날짜를 받음)
+      tail_day  : 블록에서 마지막으로 본 날짜 구분선
+    """
+    head = []
+    records = []
+    pending = None
+    closed = False
+    day = None
+    n_undated = None
 
-    score = {
-        "I": 0, "E": 0,
-        "N": 0, "S": 0,
-        "T": 0, "F": 0,
-        "J": 0, "P": 0,
-    }
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
 
-    # 간단한 예시 룰 (추후 고도화 가능)
-    if len(text) / max(len(messages), 1) > 15:
-        score["E"] += 1
-    else:
-        score["I"] += 1
+        kind, record = match_line(line)
 
-    if re.search(r"상상|미래|가능성|느낌", text):
-        score["N"] += 1
-    else:
-        score["S"] += 1
+        if kind is None:
+            if not closed:
+                head.append(line)
+            elif pending is not None:
+                pending[2] += "\n" + line
+            continue
+
+        closed = True
+        if pending is not None:
+            records.append(pending)
+
+        if kind == "date":
+            if n_undated is None:
+                n_undated = len(records)
+            day = record
+            record = None
+
+        pending = record if record is None else stamp_with_day(record, day)
+
+    if pending is not None:
+        records.append(pending)
+    if n_undated is None:
+        n_undated = len(records)
+
+    return head, records, closed, pending is not None, n_undated, day
 
-    if re.search(r"논리|근거|이성적", text):
-        score["T"] += 1
+
+def _parse_span(task) -> tuple:
+    """
+    프로세스 풀 작업 단위: (경로 또는 bytes, 시작, 끝, 인코딩)
+    경로면 워커에서 직접 mmap 으로 해당 구간만 읽음
+    """
+    data, start, end, encoding = task
+
+    if isinstance(data, str):
+        with open(data, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw = mm[start:end]
     else:
-        score["F"] += 1
+        raw = data
+
+    text = raw.decode(encoding, errors="ignore")
+    return parse_line_block(text.splitlines())
 
-    if re.search(r"계획|정리|일정", text):
-        score["J"] += 1
+
+def merge_line_blocks(blocks) -> List[list]:
+    """
+    블록별 파싱 결과를 원래 순서대로 합침
+    블록 앞부분의 이어지는 줄은 직전 블록의 마지막 메시지에 붙임
+    """
+    records = []
+    tail_open = False
+    day = None
+
+    for head, block_records, closed, block_tail_open, n_undated, tail_day in blocks:
+        if head and tail_open and records:
+            records[-1][2] += "\n" + "\n".join(head)
+        for record in block_records[:n_undated]:
+            stamp_with_day(record, day)
+        records.extend(block_records)
+        if closed:
+            tail_open = block_tail_open
+        if tail_day is not None:
+            day = tail_day
+
+    return records
+
+
+def parse_kakao_chat_parallel(
+    source,
+    my_name: str = "",
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_PARALLEL_CHUNK_BYTES,
+) -> pd.DataFrame:
+    """
+    parse_kakao_chat 과 같은 결과를 프로세스 풀로 나눠서 계산
+    source: 파일 경로(Path, mmap 사용) / bytes / str / 파일 객체 (바이너리 / 텍스트 모드)
+    workers: 프로세스 수 (None 이면 CPU 수), chunk_size: 작업 하나당 바이트 수
+    """
+    path = None
+    mm = None
+    f = None
+
+    if isinstance(source, os.PathLike):
+        path = os.fspath(source)
+        f = open(path, "rb")
+        if os.fstat(f.fileno()).st_size:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = mm if mm is not None else b""
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        buf = bytes(source)
+    elif isinstance(source, str):
+        buf = source.encode("utf-8")
     else:
-        score["P"] += 1
+        buf = source.read()
+        if isinstance(buf, str):
+            # 텍스트 모드 파일 객체 → str 입력과 같이 utf-8 로
+            buf = buf.encode("utf-8")
 
-    mbti = (
-        ("E" if score["E"] >= score["I"] else "I") +
-        ("N" if score["N"] >= score["S"] else "S") +
-        ("T" if score["T"] >= score["F"] else "F") +
-        ("J" if score["J"] >= score["P"] else "P")
-    )
+    try:
+        encoding = sniff_encoding(buf)
+        start = 0
+        if encoding == "utf-8-sig":
+            encoding = "utf-8"
+            start = len(UTF8_BOM)
+
+        spans = split_line_spans(buf, chunk_size, start=start)
+        if path is not None:
+            tasks = [(path, s, e, encoding) for s, e in spans]
+        else:
+            tasks = [(buf[s:e], s, e, encoding) for s, e in spans]
+
+        if workers == 1 or len(tasks) <= 1:
+            blocks = [_parse_span(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                blocks = list(pool.map(_parse_span, tasks))
+    finally:
+        if mm is not None:
+            mm.close()
+        if f is not None:
+            f.close()
+
+    with span("parse_merge", blocks=len(blocks)) as sp:
+        df = build_chat_frame(merge_line_blocks(blocks))
+        sp.set(rows=len(df))
+    return df
+
+
+# -----------------------------
+# 2. 말투 스타일 분석
+# -----------------------------
+def analyze_style(df: pd.DataFrame) -> Dict:
+    with span("style", rows=len(df)):
+        features = extract_features(df["message"], scans=["style"])
+        return style_from_features(features.iloc[0])
+
+
+# -----------------------------
+# 3. 규칙 기반 MBTI 추정
+# -----------------------------
+def estimate_mbti(df: pd.DataFrame) -> Dict:
+    messages = df["message"].astype(str)
 
-    return {
-        "mbti": mbti,
-        "detail_score": score
-    }
+    # 규칙은 data/mbti_rules.json (메시지를 합치지 않고 하나씩 매칭)
+    with span("rule_mbti", rows=len(messages)):
+        return load_rule_engine().score_messages(messages)
@@ -1,43 +1,393 @@
 # mbti_project/analysis_ml.py
 
+import hashlib
+import platform
+import threading
+from collections import deque
 import joblib
+import numpy as np
+import pandas as pd
 from pathlib import Path
-from typing import List, Dict
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from typing import List, Dict, Optional
+
+from instrumentation import span
 
 # 학습된 MBTI 모델 경로
 MODEL_PATH = Path("models/mbti_model.joblib")
+# 축별 이진 모델 경로 (train_mbti_model.py --axes 로 생성)
+AXIS_MODEL_PATH = Path("models/mbti_model_axes.joblib")
+# 윈도우는 mmap 으로 열린 파일을 교체(os.replace)할 수 없어서 재학습이 막히므로 일반 로드
+DEFAULT_MMAP_MODE = None if platform.system() == "Windows" else "r"
+
+
+# -----------------------------
+# 모델 레지스트리 (프로세스당 한 번만 로드)
+# -----------------------------
+class ModelRegistry:
+    """
+    경로별 모델 번들을 프로세스 안에서 한 번만 로드해서 재사용
+    파일의 mtime/크기가 바뀌면 해시를 다시 계산하고, 내용이 달라졌을 때만 다시 로드
+    numpy 배열은 mmap_mode="r" 로 읽어서 여러 워커 프로세스가 같은 페이지를 공유
+    (학습 스크립트는 모델을 임시 파일 → rename 으로 저장하므로 매핑된 예전 파일은 그대로 유지됨)
+    """
+
+    def __init__(self, mmap_mode: Optional[str] = DEFAULT_MMAP_MODE):
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        # 경로 → {"stat": (mtime_ns, size), "hash": str, "bundle": dict}
+        self._entries: Dict[Path, Dict] = {}
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def get(self, path: Path = MODEL_PATH) -> Dict:
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(
+                "ML 모델이 존재하지 않습니다. "
+                "mbti_project 폴더에서 train_mbti_model.py를 먼저 실행해서 "
+                f"{path.as_posix()} 파일을 만들어 주세요."
+            )
+
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry["stat"] == key:
+                return entry["bundle"]
+
+            file_hash = self._file_hash(path)
+            if entry is not None and entry["hash"] == file_hash:
+                # 파일만 다시 써졌고 내용은 같음
+                entry["stat"] = key
+                return entry["bundle"]
+
+            with span("model_load", path=str(path)):
+                bundle = joblib.load(path, mmap_mode=self.mmap_mode)
+            self._entries[path] = {"stat": key, "hash": file_hash, "bundle": bundle}
+            return bundle
+
+    def version(self, path: Path = MODEL_PATH) -> Optional[str]:
+        """
+        현재 로드된 모델 파일의 해시 (캐시 키 등에 사용, 없으면 None)
+        """
+        try:
+            self.get(path)
+        except FileNotFoundError:
+            return None
+        return self._entries[Path(path)]["hash"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+MODEL_REGISTRY = ModelRegistry()
+
+
+def load_model_bundle(path: Path = MODEL_PATH) -> Dict:
+    """
+    모델 번들 (vectorizer + model) 을 레지스트리에서 가져옴
+    """
+    return MODEL_REGISTRY.get(path)
+
+
+def predict_proba_combined(combined_texts: List[str], path: Path = MODEL_PATH):
+    """
+    화자별로 합친 문자열 목록을 한 번에 벡터화 + predict_proba
+    반환: (클래스 배열, 확률 행렬 [문자열 수 × 클래스 수])
+    """
+    model_bundle = load_model_bundle(path)
+    vectorizer = model_bundle["vectorizer"]
+    model = model_bundle["model"]
+
+    with span("ml_predict", rows=len(combined_texts)):
+        X = vectorizer.transform(combined_texts)
+        return model.classes_, model.predict_proba(X)
+
+
+def predict_mbti_ml_batch(texts_by_speaker: Dict[str, List[str]]) -> Dict[str, Dict]:
+    """
+    texts_by_speaker: {화자: 대화 문장 리스트}
+    반환: {화자: {"mbti": "INTJ", "confidence": 0.73, "proba": {"INTJ": 0.73, ...}}}
+    모든 화자를 한 번의 transform / predict_proba 로 계산하고, 라벨은 확률의 argmax
+    """
+    names = list(texts_by_speaker.keys())
+    if not names:
+        return {}
+
+    # 화자마다 여러 문장을 하나의 문자열로 합치기
+    combined = [" ".join(texts_by_speaker[name]) for name in names]
+    classes, proba = predict_proba_combined(combined)
+    best = proba.argmax(axis=1)
+
+    results = {}
+    for row, name in enumerate(names):
+        results[name] = {
+            "mbti": str(classes[best[row]]),
+            "confidence": round(float(proba[row, best[row]]), 3),
+            "proba": {str(cls): float(p) for cls, p in zip(classes, proba[row])},
+        }
+    return results
+
 
 def predict_mbti_ml(texts: List[str]) -> Dict:
     """
     texts: 대화 문장 리스트 (상대방이든 나든 아무나)
     반환: {"mbti": "INTJ", "confidence": 0.73} 형태
     """
+    result = predict_mbti_ml_batch({"": texts})[""]
+
+    return {
+        "mbti": result["mbti"],
+        "confidence": result["confidence"],
+    }
+
+
+# -----------------------------
+# 축별 이진 모델 예측
+# -----------------------------
+def axis_proba(bundle: Dict, combined_texts: List[str]):
+    """
+    축별 모델 bundle 로 각 문자열의 양성 글자 확률과 4글자 유형 계산
+    반환: (확률 행렬 [문자열 수 × 4], 유형 문자열 리스트)
+    """
+    X = bundle["vectorizer"].transform(combined_texts)
+    proba = 1.0 / (1.0 + np.exp(-(X @ bundle["coef"].T + bundle["intercept"])))
+
+    letters = []
+    for row in proba:
+        letters.append("".join(
+            positive if p >= 0.5 else axis.replace(positive, "")
+            for axis, positive, p in zip(bundle["axes"], bundle["positive"], row)
+        ))
+    return proba, letters
+
+
+def predict_mbti_axes_batch(texts_by_speaker: Dict[str, List[str]], path: Path = AXIS_MODEL_PATH) -> Dict[str, Dict]:
+    """
+    texts_by_speaker: {화자: 대화 문장 리스트}
+    반환: {화자: {"mbti": "INTJ", "confidence": 0.21, "axes": {"EI": {"E": 0.4, "I": 0.6}, ...}}}
+    confidence 는 고른 네 글자 확률의 곱
+    """
+    names = list(texts_by_speaker.keys())
+    if not names:
+        return {}
+
+    bundle = load_model_bundle(path)
+    proba, letters = axis_proba(bundle, [" ".join(texts_by_speaker[name]) for name in names])
+
+    results = {}
+    for row, name in enumerate(names):
+        axes = {}
+        confidence = 1.0
+        for axis, positive, p in zip(bundle["axes"], bundle["positive"], proba[row]):
+            negative = axis.replace(positive, "")
+            axes[axis] = {axis[0]: 0.0, axis[1]: 0.0}
+            axes[axis][positive] = float(p)
+            axes[axis][negative] = float(1.0 - p)
+            confidence *= max(p, 1.0 - p)
+        results[name] = {
+            "mbti": letters[row],
+            "confidence": round(float(confidence), 3),
+            "axes": axes,
+        }
+    return results
+
+
+def predict_mbti_axes(texts: List[str], path: Path = AXIS_MODEL_PATH) -> Dict:
+    """
+    predict_mbti_ml 과 같은 형태에 축별 확률("axes")을 더한 결과
+    """
+    return predict_mbti_axes_batch({"": texts}, path)[""]
+
+
+# -----------------------------
+# 구간(윈도우)별 스트리밍 예측
+# -----------------------------
+WINDOW_SIZE = 200
+WINDOW_STEP = 100
+WINDOW_BATCH = 256
+
+
+def time_order(timestamps) -> np.ndarray:
+    """
+    timestamps 에서 NaT 를 뺀 행 위치를 시간순으로 (같은 시각은 원래 순서 유지)
+    """
+    times = np.asarray(timestamps, dtype="datetime64[ns]")
+    rows = np.flatnonzero(~np.isnat(times))
+    return rows[np.argsort(times[rows], kind="stable")]
 
-    if not MODEL_PATH.exists():
-        raise FileNotFoundError(
-            "ML 모델이 존재하지 않습니다. "
-            "mbti_project 폴더에서 train_mbti_model.py를 먼저 실행해서 "
-            "models/mbti_model.joblib 파일을 만들어 주세요."
-        )
 
-    # 모델 번들 로드 (vectorizer + model)
-    model_bundle = joblib.load(MODEL_PATH)
+def window_bounds(
+    n_messages: int,
+    window: int = WINDOW_SIZE,
+    step: int = WINDOW_STEP,
+    timestamps=None,
+    window_time: Optional[str] = None,
+    step_time: Optional[str] = None,
+) -> List[tuple]:
+    """
+    메시지 위치 기준 (시작, 끝) 구간 목록
+    - 기본: window 개씩, step 개 간격 (마지막 남는 메시지도 포함되도록 끝에 한 구간 추가)
+    - window_time 을 주면 timestamps 기준 기간 구간 ("7D", "12h" 등)
+      timestamps 는 NaT 없이 정렬돼 있어야 함 (아니면 time_order 로 먼저 정리)
+    """
+    if window_time is not None:
+        times = np.asarray(timestamps, dtype="datetime64[ns]")
+        if len(times) == 0:
+            return []
+        if np.isnat(times).any():
+            raise ValueError("timestamps 에 NaT 가 있습니다. time_order 로 NaT 를 뺀 행만 넘겨 주세요.")
+        if (times[1:] < times[:-1]).any():
+            raise ValueError("timestamps 가 시간순이 아닙니다. time_order 로 정렬한 행만 넘겨 주세요.")
+        width = np.timedelta64(pd.Timedelta(window_time).value, "ns")
+        stride = np.timedelta64(pd.Timedelta(step_time or window_time).value, "ns")
+        starts = np.arange(times[0], times[-1] + np.timedelta64(1, "ns"), stride)
+        lo = np.searchsorted(times, starts, side="left")
+        hi = np.searchsorted(times, starts + width, side="left")
+        return [(int(s), int(e)) for s, e in zip(lo, hi) if e > s]
+
+    if n_messages == 0:
+        return []
+    bounds = [(s, min(s + window, n_messages)) for s in range(0, max(n_messages - window, 0) + 1, step)]
+    if bounds[-1][1] < n_messages:
+        bounds.append((max(0, n_messages - window), n_messages))
+    return bounds
+
+
+def _message_term_ids(vectorizer, analyzer, message: str):
+    """
+    메시지 하나의 (어휘 id 배열, 횟수 배열)
+    """
+    vocabulary = vectorizer.vocabulary_
+    ids = {}
+    for term in analyzer(message):
+        idx = vocabulary.get(term)
+        if idx is not None:
+            ids[idx] = ids.get(idx, 0) + 1
+    return np.fromiter(ids.keys(), dtype=np.int64, count=len(ids)), np.fromiter(ids.values(), dtype=np.float64, count=len(ids))
+
+
+def _tfidf_rows(vectorizer, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    구간별 단어 횟수 행렬에 vectorizer 와 같은 tf-idf 변환 적용
+    """
+    X = counts.astype(np.float64)
+    if vectorizer.sublinear_tf:
+        X.data = np.log(X.data) + 1
+    if vectorizer.use_idf:
+        X = sparse.csr_matrix(X.multiply(vectorizer.idf_))
+    if vectorizer.norm:
+        X = normalize(X, norm=vectorizer.norm, copy=False)
+    return X
+
+
+def predict_mbti_ml_windows(
+    messages: List[str],
+    window: int = WINDOW_SIZE,
+    step: int = WINDOW_STEP,
+    timestamps=None,
+    window_time: Optional[str] = None,
+    step_time: Optional[str] = None,
+    batch_windows: int = WINDOW_BATCH,
+) -> Dict:
+    """
+    메시지를 구간으로 나눠 구간마다 MBTI 확률을 예측 (시간에 따른 변화 확인용)
+    전체 문장을 합치지 않고 메시지별 단어 횟수를 더하고 빼면서 겹치는 구간을 이어서 계산
+    (메시지 경계를 넘는 bigram 은 세지 않으므로 predict_mbti_ml 과 값이 조금 다를 수 있음)
+
+    window_time 을 주면 timestamps 가 NaT 인 메시지는 빼고 시간순으로 구간을 나눔
+    (start / end 는 원래 messages 의 위치, 정렬된 입력이면 end 는 마지막 메시지 다음 위치)
+
+    반환: {"windows": [{"start", "end", "mbti", "confidence", "proba"}, ...],
+           "aggregate": {"mbti", "confidence", "proba"}}  aggregate 는 구간 확률 평균
+    """
+    model_bundle = load_model_bundle(MODEL_PATH)
     vectorizer = model_bundle["vectorizer"]
     model = model_bundle["model"]
+    analyzer = vectorizer.build_analyzer()
+    classes = [str(cls) for cls in model.classes_]
+
+    if window_time is not None:
+        # 시각이 없는(NaT) 메시지는 빼고 시간순으로 → 구간 위치는 다시 원래 행 위치로 돌려서 반환
+        order = time_order(timestamps)
+        times = np.asarray(timestamps, dtype="datetime64[ns]")[order]
+        messages = [messages[i] for i in order]
+        bounds = window_bounds(len(messages), window, step, times, window_time, step_time)
+    else:
+        order = np.arange(len(messages))
+        bounds = window_bounds(len(messages), window, step)
+
+    running = np.zeros(len(vectorizer.vocabulary_), dtype=np.float64)
+    in_window = deque()  # 현재 구간에 들어 있는 메시지의 (id, 횟수)
+    added = 0
+    removed = 0
+
+    windows = []
+    proba_sum = np.zeros(len(classes))
+    pending_rows = []
+    pending_bounds = []
 
-    # 여러 문장을 하나의 문자열로 합치기
-    combined_text = " ".join(texts)
+    def flush():
+        if not pending_rows:
+            return
+        proba = model.predict_proba(_tfidf_rows(vectorizer, sparse.vstack(pending_rows, format="csr")))
+        proba_sum[:] += proba.sum(axis=0)
+        for (start, end), row in zip(pending_bounds, proba):
+            best = int(row.argmax())
+            item = {
+                "start": int(order[start]),
+                "end": int(order[end - 1]) + 1,
+                "mbti": classes[best],
+                "confidence": round(float(row[best]), 3),
+                "proba": {cls: float(p) for cls, p in zip(classes, row)},
+            }
+            if window_time is not None:
+                item["start_time"] = pd.Timestamp(times[start])
+                item["end_time"] = pd.Timestamp(times[end - 1])
+            windows.append(item)
+        pending_rows.clear()
+        pending_bounds.clear()
 
-    # 벡터화
-    X = vectorizer.transform([combined_text])
+    for start, end in bounds:
+        while added < end:
+            ids, cnts = _message_term_ids(vectorizer, analyzer, str(messages[added]))
+            running[ids] += cnts
+            in_window.append((ids, cnts))
+            added += 1
+        while removed < start:
+            ids, cnts = in_window.popleft()
+            running[ids] -= cnts
+            removed += 1
 
-    # 예측
-    proba = model.predict_proba(X)[0]
-    pred = model.predict(X)[0]
+        nonzero = np.flatnonzero(running)
+        pending_rows.append(sparse.csr_matrix(
+            (running[nonzero], nonzero, [0, len(nonzero)]), shape=(1, len(running))
+        ))
+        pending_bounds.append((start, end))
+        if len(pending_rows) >= batch_windows:
+            flush()
+    flush()
 
-    confidence = float(max(proba))
+    if not windows:
+        return {"windows": [], "aggregate": {}}
 
+    mean = proba_sum / len(windows)
+    best = int(mean.argmax())
     return {
-        "mbti": pred,
-        "confidence": round(confidence, 3),
+        "windows": windows,
+        "aggregate": {
+            "mbti": classes[best],
+            "confidence": round(float(mean[best]), 3),
+            "proba": {cls: float(p) for cls, p in zip(classes, mean)},
+        },
     }
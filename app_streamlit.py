@@ -1,3 +1,4 @@
+import json
 import streamlit as st
 import pandas as pd
 from pathlib import Path
@@ -5,9 +6,18 @@ import platform
 import matplotlib.pyplot as plt
 from matplotlib import font_manager, rc
 
-from analysis import parse_kakao_chat, analyze_style, estimate_mbti
-from analysis_ml import predict_mbti_ml
-from emotion_analysis import analyze_emotions
+from chat_cache import chat_cache_key, parse_kakao_chat_cached
+from conversation_dynamics import MIN_REPLIES, affinity_matrix
+from instrumentation import span, tracing
+from partition import SpeakerPartition
+from analysis_ml import MODEL_REGISTRY, predict_mbti_ml_batch
+from features import (
+    emotions_from_features,
+    extract_speaker_features,
+    mbti_from_features,
+    style_from_features,
+)
+from sampling import DEFAULT_ERROR_TARGET, EXACT_BELOW, approximate_speaker_analysis, stratified_sample
 
 # -----------------------------
 # matplotlib 한글 폰트 설정
@@ -99,45 +109,176 @@ def split_layout():
 
 
 # 👉 호감도(재미용) 계산 함수
-def estimate_crush_percentage(df_chat: pd.DataFrame, me: str, partner: str):
+def estimate_crush_percentage(affinity: pd.DataFrame, me: str, partner: str):
     """
     partner가 me에게 가지고 있는 호감도를
-    말투 키워드 비율로 대충(재미용) 계산하는 함수.
+    답장 패턴 + 말투 키워드 비율로 대충(재미용) 계산하는 함수.
+    affinity: chat_affinity 로 대화당 한 번 계산한 전체 화자 쌍 행렬
     """
-    if "speaker" not in df_chat.columns or "message" not in df_chat.columns:
+    if affinity is None or partner not in affinity.index or me not in affinity.columns:
         return None
 
-    partner_msgs = (
-        df_chat[df_chat["speaker"] == partner]["message"].astype(str).tolist()
-    )
+    # 대화가 너무 적으면 계산 안 함 (NaN)
+    like_percent = affinity.loc[partner, me]
+    return None if pd.isna(like_percent) else float(like_percent)
 
-    # 대화가 너무 적으면 계산 안 함
-    if len(partner_msgs) < 5:
-        return None
 
-    positive_keywords = [
-        "좋아", "좋아해", "좋아용",
-        "사랑", "사랑해",
-        "보고싶", "보고 싶",
-        "고마워", "고맙",
-        "귀여워", "귀엽", "예쁘", "이쁘", "멋있",
-        "행복", "즐거웠", "기뻐",
-        "❤️", "💖", "💕", "💗",
-    ]
+# -----------------------------
+# 분석 결과 캐시
+# - 업로드 해시 / 분석 모드 / 모델 버전 / 근사 설정이 같으면 위젯을 바꿔도 다시 계산하지 않음
+# - cache_resource: 재실행마다 DataFrame / 결과 dict 를 pickle 로 복사하지 않고 같은 객체를 돌려줌
+#   (세션끼리 공유하므로 반환값은 읽기만 함)
+# -----------------------------
+@st.cache_resource
+def get_model_registry():
+    # 모델 번들은 세션 / 재실행 사이에 공유 (파일 내용이 바뀌면 레지스트리가 다시 로드)
+    return MODEL_REGISTRY
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def load_chat_frame(upload_key: str, _raw_bytes: bytes) -> pd.DataFrame:
+    # _raw_bytes 는 해시하지 않고 upload_key 로 구분 (파싱 결과는 내 이름과 무관)
+    return parse_kakao_chat_cached(_raw_bytes, my_name="")
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def analyze_participants(
+    upload_key: str,
+    analysis_mode: str,
+    model_version,
+    approx,
+    _df_chat: pd.DataFrame,
+) -> dict:
+    """
+    참가자별 MBTI (규칙 / ML) / 말투 스타일 / 감정 분석 결과
+    approx: None 이면 전체 계산, (화자당 표본 수 또는 None, 오차 목표) 면 화자별 표본으로 추정
+    """
+    # 화자 → 행 위치 인덱스 (한 번의 정렬, 화자별 DataFrame 복사 없음)
+    partition = SpeakerPartition.from_frame(_df_chat)
+    participants = partition.speakers
+
+    mbti_rule = {}
+    mbti_ml = {}
+    style_results = {}
+    emotion_results = {}
+    # 근사 분석일 때 지표별 95% 신뢰구간 / 규칙 MBTI 글자별 비율의 신뢰구간 / 화자별 표본 수
+    style_ci = {}
+    rule_ci = {}
+    sample_sizes = {}
+
+    if approx is not None:
+        sample_size, error_target = approx
+        sample = stratified_sample(partition, sample_size=sample_size, error_target=error_target)
+        estimates = approximate_speaker_analysis(_df_chat, sample)
+
+        for name, estimate in estimates.items():
+            rule_result = estimate["mbti_rule"]
+            mbti_rule[name] = rule_result.get("mbti") if analysis_mode in ["규칙 기반", "둘 다 비교"] else None
+            mbti_ml[name] = None
+            style_results[name] = {k: v["value"] for k, v in estimate["style"].items()}
+            style_ci[name] = None if estimate["exact"] else {k: v["ci"] for k, v in estimate["style"].items()}
+            rule_ci[name] = None if estimate["exact"] else rule_result["letter_rates"]
+            emotion_results[name] = estimate["emotions"]
+            sample_sizes[name] = estimate["n_sampled"]
+
+        # ML 도 표본 메시지로 예측 (표본 행만 문자열로 변환)
+        if analysis_mode in ["ML 기반", "둘 다 비교"]:
+            messages = _df_chat["message"].to_numpy()
+            ml_results = predict_mbti_ml_batch(
+                {name: messages[rows].astype(str) for name, rows in sample["positions"].items() if len(rows)}
+            )
+            for name, ml_result in ml_results.items():
+                mbti_ml[name] = ml_result.get("mbti")
+
+        return {
+            "participants": participants,
+            "message_counts": partition.sizes().to_dict(),
+            "mbti_rule": mbti_rule,
+            "mbti_ml": mbti_ml,
+            "style_results": style_results,
+            "emotion_results": emotion_results,
+            "style_ci": style_ci,
+            "rule_ci": rule_ci,
+            "sample_sizes": sample_sizes,
+        }
+
+    # speaker -> text 맵 (메시지 열을 한 번 정렬한 배열의 화자별 view)
+    speaker_texts = partition.groups(_df_chat["message"].astype(str).to_numpy())
+
+    # 스타일 / 규칙 MBTI / 감정에 필요한 값을 화자별로 한꺼번에 계산
+    speaker_features = extract_speaker_features(_df_chat, partition)
+
+    for name in participants:
+        texts_person = speaker_texts[name]
+        with span("speaker", speaker=name, rows=len(texts_person)):
+            features_person = speaker_features.loc[name]
+
+            # MBTI - 규칙 기반
+            if analysis_mode in ["규칙 기반", "둘 다 비교"]:
+                rule_result = mbti_from_features(features_person)
+                mbti_rule[name] = (
+                    rule_result.get("mbti") if isinstance(rule_result, dict) else rule_result
+                )
+            else:
+                mbti_rule[name] = None
+
+            # MBTI - ML 기반 (아래에서 전체 화자를 한 번에 예측)
+            mbti_ml[name] = None
 
-    positive_count = 0
-    for msg in partner_msgs:
-        if any(kw in msg for kw in positive_keywords):
-            positive_count += 1
+            # 말투 스타일
+            style_results[name] = style_from_features(features_person)
 
-    # 비율 계산
-    ratio = positive_count / len(partner_msgs)
-    ratio = max(0.0, min(ratio, 1.0))
+            # 감정 분석
+            emotion_results[name] = emotions_from_features(features_person) if len(texts_person) else {}
 
-    # 베이스 20% + 키워드 비율 * 80%  (0~100 사이)
-    like_percent = round(20 + ratio * 80, 1)
-    like_percent = max(0.0, min(like_percent, 100.0))
-    return like_percent
+    # MBTI - ML 기반: 전체 화자를 한 번의 벡터화 + 예측으로 계산
+    if analysis_mode in ["ML 기반", "둘 다 비교"]:
+        ml_results = predict_mbti_ml_batch(
+            {name: texts for name, texts in speaker_texts.items() if len(texts)}
+        )
+        for name, ml_result in ml_results.items():
+            mbti_ml[name] = ml_result.get("mbti")
+
+    return {
+        "participants": participants,
+        "message_counts": partition.sizes().to_dict(),
+        "mbti_rule": mbti_rule,
+        "mbti_ml": mbti_ml,
+        "style_results": style_results,
+        "emotion_results": emotion_results,
+        "style_ci": style_ci,
+        "rule_ci": rule_ci,
+        "sample_sizes": sample_sizes,
+    }
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def chat_affinity(upload_key: str, _df_chat: pd.DataFrame):
+    """
+    모든 화자 쌍의 호감도 행렬 (대화당 한 번, 답장이 MIN_REPLIES 번 미만인 쌍은 NaN)
+    """
+    if not {"datetime", "speaker", "message"}.issubset(_df_chat.columns):
+        return None
+    return affinity_matrix(_df_chat)
+
+
+def show_performance_panel(tracer):
+    """
+    사이드바에 이번 실행의 단계별 시간 / 행 수 / 메모리 증가량 표시 + JSON 내려받기
+    """
+    with st.sidebar.expander("⏱️ 성능", expanded=True):
+        summary = tracer.summary()
+        if not summary:
+            st.caption("기록된 단계가 없습니다.")
+            return
+        st.dataframe(pd.DataFrame(summary).set_index("name"), use_container_width=True)
+        st.caption("캐시에서 바로 읽은 단계는 하위 단계 없이 짧게 표시됩니다.")
+        st.download_button(
+            "trace JSON 내려받기",
+            data=json.dumps(tracer.to_dict(), ensure_ascii=False, indent=2),
+            file_name="trace.json",
+            mime="application/json",
+        )
 
 
 # -----------------------------
@@ -158,6 +299,20 @@ def main():
     )
 
     show_raw_chat = st.sidebar.checkbox("파싱된 대화 DataFrame 보기", value=False)
+    show_performance = st.sidebar.checkbox("⏱️ 성능 패널 보기", value=False)
+    trace_memory = show_performance and st.sidebar.checkbox("메모리 증가량도 측정 (느려짐)", value=False)
+
+    # 대형 오픈채팅: 화자별 표본으로 근사 분석 (지표 옆에 95% 신뢰구간 표시)
+    approx = None
+    if st.sidebar.checkbox("🎲 근사 분석 (대형 오픈채팅용)", value=False):
+        basis = st.sidebar.radio("표본 기준", options=["오차 목표", "표본 크기"], horizontal=True)
+        if basis == "오차 목표":
+            error_pct = st.sidebar.slider("비율 지표 오차 (±%p)", 0.5, 5.0, DEFAULT_ERROR_TARGET * 100, 0.5)
+            approx = (None, error_pct / 100)
+        else:
+            sample_size = st.sidebar.number_input("화자당 표본 메시지 수", min_value=100, value=EXACT_BELOW, step=100)
+            approx = (int(sample_size), DEFAULT_ERROR_TARGET)
+        st.sidebar.caption(f"메시지가 {EXACT_BELOW:,}개 이하인 화자는 표본 없이 전부 계산합니다.")
 
     uploaded_file = st.file_uploader("📁 카카오톡 대화 txt 업로드", type=["txt"])
 
@@ -184,18 +339,27 @@ def main():
     if not st.session_state["run_analysis"]:
         return
 
+    # 성능 패널이 켜져 있으면 이번 실행의 단계별 시간 / 메모리 기록
+    with tracing(enabled=show_performance, memory=trace_memory) as tracer:
+        render_analysis(uploaded_file, my_name, analysis_mode, show_raw_chat, approx)
+    if tracer is not None:
+        show_performance_panel(tracer)
+
+
+def render_analysis(uploaded_file, my_name: str, analysis_mode: str, show_raw_chat: bool, approx=None):
     with st.spinner("카카오톡 대화 파싱 및 분석 중입니다..."):
         try:
-            # txt → 문자열
+            # txt 업로드 (디코딩은 파서가 스트리밍으로 처리)
             raw_bytes = uploaded_file.getvalue()
             if not raw_bytes:
                 st.error("업로드된 파일 내용을 읽을 수 없습니다.")
                 return
 
-            raw_text = raw_bytes.decode("utf-8", errors="ignore")
-
-            # 1) 카톡 파싱
-            df_chat = parse_kakao_chat(raw_text, my_name=my_name)
+            # 1) 카톡 파싱 (같은 파일이면 캐시에서 바로 읽음)
+            with span("load_chat_frame", bytes=len(raw_bytes)) as sp:
+                upload_key = chat_cache_key(raw_bytes)
+                df_chat = load_chat_frame(upload_key, raw_bytes)
+                sp.set(rows=len(df_chat))
 
             if df_chat.empty:
                 st.error("파싱 결과가 비어 있습니다. 이름이 카톡과 동일한지, txt 형식이 맞는지 확인해 주세요.")
@@ -210,9 +374,6 @@ def main():
                 st.error("parse_kakao_chat 결과에 'speaker', 'message' 컬럼이 필요합니다.")
                 return
 
-            # -------------------------
-            # 데이터 분리
-            # -------------------------
             participants = sorted(df_chat["speaker"].dropna().unique().tolist())
 
             if not participants:
@@ -227,54 +388,26 @@ def main():
                 st.session_state["run_analysis"] = False
                 return
 
-            # speaker -> df / text 맵
-            speaker_dfs = {}
-            speaker_texts = {}
-
-            for name in participants:
-                sub_df = df_chat[df_chat["speaker"] == name].copy()
-                speaker_dfs[name] = sub_df
-                speaker_texts[name] = sub_df["message"].astype(str).tolist()
-
             # 이름 표시용 (나 표시)
             def display_name(name: str) -> str:
                 return f"{name} (나)" if name == my_name else name
 
             # -------------------------
-            # 2) MBTI / 스타일 / 감정 분석 계산
+            # 2) MBTI / 스타일 / 감정 분석 계산 (캐시)
             # -------------------------
-            mbti_rule = {}
-            mbti_ml = {}
-            style_results = {}
-            emotion_results = {}
-
-            for name in participants:
-                df_person = speaker_dfs[name]
-                texts_person = speaker_texts[name]
-
-                # MBTI - 규칙 기반
-                if analysis_mode in ["규칙 기반", "둘 다 비교"]:
-                    rule_result = estimate_mbti(df_person)
-                    mbti_rule[name] = (
-                        rule_result.get("mbti") if isinstance(rule_result, dict) else rule_result
-                    )
-                else:
-                    mbti_rule[name] = None
-
-                # MBTI - ML 기반
-                if analysis_mode in ["ML 기반", "둘 다 비교"] and texts_person:
-                    ml_result = predict_mbti_ml(texts_person)
-                    mbti_ml[name] = (
-                        ml_result.get("mbti") if isinstance(ml_result, dict) else ml_result
-                    )
-                else:
-                    mbti_ml[name] = None
-
-                # 말투 스타일
-                style_results[name] = analyze_style(df_person)
-
-                # 감정 분석
-                emotion_results[name] = analyze_emotions(texts_person) if texts_person else {}
+            uses_ml = analysis_mode in ["ML 기반", "둘 다 비교"]
+            model_version = get_model_registry().version() if uses_ml else None
+            with span("analyze_participants", rows=len(df_chat)):
+                results = analyze_participants(upload_key, analysis_mode, model_version, approx, df_chat)
+
+            message_counts = results["message_counts"]
+            mbti_rule = results["mbti_rule"]
+            mbti_ml = results["mbti_ml"]
+            style_results = results["style_results"]
+            emotion_results = results["emotion_results"]
+            style_ci = results["style_ci"]
+            rule_ci = results["rule_ci"]
+            sample_sizes = results["sample_sizes"]
 
             # -------------------------
             # 레이아웃 분할
@@ -294,6 +427,16 @@ def main():
 
                     if analysis_mode in ["규칙 기반", "둘 다 비교"]:
                         st.write(f"- 규칙 기반: `{rule_val or '-'}`")
+                        # 근사 분석이면 판정에 쓴 글자별 메시지당 키워드 가중치와 95% 신뢰구간
+                        letter_rates = rule_ci.get(person_name)
+                        if letter_rates:
+                            st.caption(
+                                "🎲 메시지당 키워드 가중치 (95% 신뢰구간): "
+                                + " · ".join(
+                                    f"{letter} {r['value']} ({r['ci'][0]} ~ {r['ci'][1]})"
+                                    for letter, r in letter_rates.items()
+                                )
+                            )
 
                     if analysis_mode in ["ML 기반", "둘 다 비교"]:
                         st.write(f"- ML 기반: `{ml_val or '-'}`")
@@ -351,18 +494,25 @@ def main():
 
                 for tab, name in zip(tabs, ordered_participants):
                     with tab:
-                        df_person = speaker_dfs[name]
-                        if df_person.empty:
+                        if not message_counts.get(name):
                             st.info("대화가 부족하여 스타일 분석이 어렵습니다.")
                             continue
 
                         style = style_results.get(name, {})
+                        ci = style_ci.get(name)
+                        if ci:
+                            st.caption(
+                                f"🎲 근사 분석: 메시지 {message_counts[name]:,}개 중 {sample_sizes[name]:,}개 표본"
+                            )
                         if isinstance(style, dict) and style:
                             for k, v in style.items():
                                 st.metric(
                                     label=k,
                                     value=round(v, 3) if isinstance(v, (int, float)) else v,
                                 )
+                                if ci:
+                                    lo, hi = ci[k]
+                                    st.caption(f"95% 신뢰구간: {lo} ~ {hi}")
                         else:
                             st.write(style)
 
@@ -400,9 +550,17 @@ def main():
                 if "examples" in emo_info:
                     st.write("**대표 문장 예시**")
                     dist = emo_info.get("distribution", {})
+                    # 근사 분석이면 감정 비율의 95% 신뢰구간도 표시 (전수 계산이면 구간 폭 0 → 생략)
+                    emo_ci = emo_info.get("ci", {})
                     for emo, example in emo_info["examples"].items():
                         percent = round(dist.get(emo, 0) * 100, 1)
-                        st.markdown(f"- **{emo}**: {example} ({percent}%)")
+                        lo, hi = emo_ci.get(emo, (None, None))
+                        if lo is not None and lo != hi:
+                            st.markdown(
+                                f"- **{emo}**: {example} ({percent}%, 95% 신뢰구간 {lo * 100:.1f}~{hi * 100:.1f}%)"
+                            )
+                        else:
+                            st.markdown(f"- **{emo}**: {example} ({percent}%)")
 
                 else:
                     st.info("감정 분석 결과가 없습니다.")
@@ -425,13 +583,40 @@ def main():
                     # 비율을 % 기준으로 표시
                     emo_values_percent = [v * 100 for v in emo_values]
 
-                    fig, ax = plt.subplots()
-                    ax.bar(emo_labels, emo_values_percent, color=bar_colors)
-                    ax.set_title(f"감정 분포 - {display_name(selected_name)}")
-                    ax.set_ylabel("비율(%)")
-                    plt.xticks(rotation=0)
+                    with span("plot", speaker=selected_name):
+                        fig, ax = plt.subplots()
+                        ax.bar(emo_labels, emo_values_percent, color=bar_colors)
+                        ax.set_title(f"감정 분포 - {display_name(selected_name)}")
+                        ax.set_ylabel("비율(%)")
+                        plt.xticks(rotation=0)
 
-                    st.pyplot(fig)
+                        st.pyplot(fig)
+                        # 재실행마다 새 figure 가 쌓이지 않도록 닫기
+                        plt.close(fig)
+
+            # -------------------------
+            # 5-1) 호감도 (재미용)
+            # -------------------------
+            others = [p for p in participants if p != my_name]
+            if others:
+                st.markdown("---")
+                st.subheader("💘 호감도 (재미용)")
+
+                with span("affinity", rows=len(df_chat)):
+                    affinity = chat_affinity(upload_key, df_chat)
+
+                crush = pd.DataFrame(
+                    {
+                        "상대 → 나": [estimate_crush_percentage(affinity, my_name, other) for other in others],
+                        "나 → 상대": [estimate_crush_percentage(affinity, other, my_name) for other in others],
+                    },
+                    index=pd.Index(others, name="상대"),
+                ).sort_values("상대 → 나", ascending=False)
+                st.dataframe(crush, use_container_width=True)
+                st.caption(
+                    f"답장 속도 / 먼저 말 걸기 / 호감 키워드로 계산한 재미용 수치입니다. "
+                    f"한쪽이 다른 쪽에게 바로 이어서 답장한 횟수가 {MIN_REPLIES}번 미만이면 그 방향은 비워 둡니다."
+                )
 
             # -------------------------
             # 6) MBTI + 유명인 
@@ -0,0 +1,292 @@
+import argparse
+import glob
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Set
+
+from analysis import parse_kakao_chat
+from analysis_ml import predict_mbti_ml_batch
+from features import (
+    emotions_from_features,
+    extract_speaker_features,
+    mbti_from_features,
+    style_from_features,
+)
+from instrumentation import span, tracing
+from partition import SpeakerPartition
+
+# 배치 분석 기본 설정
+DEFAULT_OUTPUT = Path("batch_results.jsonl")
+DEFAULT_PATTERN = "*.txt"
+
+
+# -----------------------------
+# 1. 입력 파일 찾기 / 진행 상황
+# -----------------------------
+def find_chat_files(inputs: List[str], pattern: str = DEFAULT_PATTERN) -> List[Path]:
+    """
+    디렉터리(하위 폴더 포함 pattern) / glob / 파일 경로 목록 → 중복 없는 정렬된 파일 목록
+    """
+    files = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.update(p for p in path.rglob(pattern) if p.is_file())
+        elif path.is_file():
+            files.add(path)
+        else:
+            files.update(Path(p) for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+    return sorted(p.resolve() for p in files)
+
+
+def file_signature(path: Path) -> Dict:
+    """
+    재시작 시 같은 파일인지 확인하는 값 (경로 + 크기 + 수정 시각)
+    """
+    stat = path.stat()
+    return {"file": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_finished(output: Path, retry_errors: bool = False) -> Set[tuple]:
+    """
+    이미 결과 파일에 완료(또는 에러) 기록이 있는 파일의 (경로, 크기, 수정 시각)
+    """
+    finished = set()
+    if not output.exists():
+        return finished
+
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 중단되면서 마지막 줄이 잘린 경우
+                continue
+            status = record.get("status")
+            if status == "done" or (status == "error" and not retry_errors):
+                finished.add((record["file"], record["size"], record["mtime_ns"]))
+    return finished
+
+
+# -----------------------------
+# 2. 파일 하나 분석 (워커 프로세스)
+# -----------------------------
+def analyze_file(path: Path, use_ml: bool = True, trace: bool = False) -> List[Dict]:
+    """
+    파싱 → 스타일 → 규칙 MBTI → ML MBTI → 감정
+    반환: 화자별 레코드 + 마지막에 파일 완료 레코드 (실패하면 에러 레코드 하나)
+    trace=True 면 마지막 레코드의 "trace" 에 단계별 span 기록
+    """
+    with tracing(enabled=trace) as tracer:
+        records = _analyze_file(path, use_ml)
+    if tracer is not None:
+        records[-1]["trace"] = tracer.to_dict()
+    return records
+
+
+def _analyze_file(path: Path, use_ml: bool) -> List[Dict]:
+    signature = {"file": str(path), "size": None, "mtime_ns": None}
+    started = time.perf_counter()
+
+    try:
+        signature = file_signature(path)
+        df = parse_kakao_chat(path, my_name="")
+        partition = SpeakerPartition.from_frame(df) if not df.empty else None
+        features = extract_speaker_features(df, partition) if partition is not None else None
+
+        ml_results = {}
+        if use_ml and partition is not None:
+            ml_results = predict_mbti_ml_batch(partition.groups(df["message"].astype(str).to_numpy()))
+
+        records = []
+        speakers = [] if features is None else features.index
+        for name in speakers:
+            row = features.loc[name]
+            ml = ml_results.get(str(name), {})
+            with span("speaker", speaker=str(name), rows=int(row["n_messages"])):
+                records.append({
+                    **signature,
+                    "speaker": str(name),
+                    "n_messages": int(row["n_messages"]),
+                    "style": style_from_features(row),
+                    "mbti_rule": mbti_from_features(row).get("mbti"),
+                    "mbti_ml": ml.get("mbti"),
+                    "mbti_ml_confidence": ml.get("confidence"),
+                    "emotions": emotions_from_features(row),
+                })
+    except Exception as e:
+        return [{**signature, "status": "error", "error": f"{type(e).__name__}: {e}"}]
+
+    records.append({
+        **signature,
+        "status": "done",
+        "n_speakers": len(records),
+        "n_messages": int(len(df)),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    })
+    return records
+
+
+def _to_json(value):
+    # numpy 스칼라 등 json 이 모르는 값
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+# -----------------------------
+# 3. 프로세스 풀 실행
+# -----------------------------
+def run_batch(
+    files: List[Path],
+    output: Path = DEFAULT_OUTPUT,
+    workers: int = None,
+    max_pending: int = None,
+    use_ml: bool = True,
+    retry_errors: bool = False,
+    trace_path: Path = None,
+) -> Dict:
+    """
+    파일별 분석을 프로세스 풀에서 실행하고, 끝나는 순서대로 output 에 JSONL 로 이어 쓰기
+    - 이미 완료 기록이 있는 파일은 건너뜀 (중단 후 같은 명령으로 다시 실행하면 이어서 진행)
+    - 동시에 제출하는 작업은 max_pending 개까지 (파일 수천 개여도 결과가 메모리에 쌓이지 않음)
+    - trace_path 를 주면 파일별 단계 span 을 JSONL 로 따로 저장
+    - 워커 프로세스가 죽으면 (메모리 부족 등) 그 파일만 에러로 기록하고 새 풀로 나머지를 계속 진행
+    """
+    finished = load_finished(output, retry_errors=retry_errors)
+    todo = []
+    for path in files:
+        sig = file_signature(path)
+        if (sig["file"], sig["size"], sig["mtime_ns"]) not in finished:
+            todo.append(path)
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    summary = {"files": len(files), "skipped": len(files) - len(todo), "done": 0, "errors": 0, "speakers": 0}
+    started = time.perf_counter()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    trace_out = open(trace_path, "a", encoding="utf-8") if trace_path else None
+    queue = deque(todo)
+    # 워커가 죽어서 풀이 깨질 때 실행 중이던 파일 → 하나씩 따로 다시 실행해서 원인 파일만 에러로 기록
+    suspects = deque()
+    pending = {}
+    pool = ProcessPoolExecutor(max_workers=workers)
+
+    def fill() -> bool:
+        # 제출 중에 풀이 깨져 있으면 False (파일은 다시 대기열 앞으로)
+        source = suspects if suspects else queue
+        while source and len(pending) < (1 if source is suspects else max_pending):
+            path = source.popleft()
+            try:
+                pending[pool.submit(analyze_file, path, use_ml, trace_out is not None)] = path
+            except BrokenProcessPool:
+                source.appendleft(path)
+                return False
+        return True
+
+    def write(path: Path, records: List[Dict]) -> None:
+        trace = records[-1].pop("trace", None)
+        if trace_out is not None and trace is not None:
+            trace_out.write(json.dumps({"file": str(path), **trace}, ensure_ascii=False) + "\n")
+            trace_out.flush()
+
+        # 파일 하나의 레코드를 한 번에 쓰고 flush (완료 레코드가 항상 마지막)
+        out.write("".join(json.dumps(r, ensure_ascii=False, default=_to_json) + "\n" for r in records))
+        out.flush()
+
+        status = records[-1].get("status")
+        if status == "done":
+            summary["done"] += 1
+            summary["speakers"] += records[-1]["n_speakers"]
+        else:
+            summary["errors"] += 1
+            print(f"⚠️ {path}: {records[-1]['error']}")
+
+    def error_records(path: Path, e: Exception) -> List[Dict]:
+        return [{"file": str(path), "size": None, "mtime_ns": None,
+                 "status": "error", "error": f"{type(e).__name__}: {e}"}]
+
+    def collect(futures) -> List[tuple]:
+        # 끝난 작업의 결과를 기록하고, 풀이 깨져서 실패한 (파일, 에러) 는 따로 반환
+        broken = []
+        for future in futures:
+            path = pending.pop(future)
+            try:
+                records = future.result()
+            except BrokenProcessPool as e:
+                broken.append((path, e))
+                continue
+            except Exception as e:
+                records = error_records(path, e)
+            write(path, records)
+        return broken
+
+    with open(output, "a", encoding="utf-8") as out:
+        try:
+            while queue or suspects or pending:
+                if not fill() and not pending:
+                    # 실행 중인 작업 없이 풀이 깨짐 → 새 풀로 다시 시작
+                    pool.shutdown(wait=True)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                broken = collect(done)
+                if not broken:
+                    continue
+
+                # 풀이 깨지면 나머지 작업도 곧 같이 실패 → 먼저 끝난 결과는 그대로 기록
+                broken += collect(wait(pending).done)
+                if len(broken) == 1:
+                    # 혼자 실패했으면 그 파일이 원인
+                    path, e = broken[0]
+                    write(path, error_records(path, e))
+                else:
+                    suspects.extend(path for path, _ in broken)
+                pool.shutdown(wait=True)
+                pool = ProcessPoolExecutor(max_workers=workers)
+        finally:
+            pool.shutdown(wait=True)
+    if trace_out is not None:
+        trace_out.close()
+
+    summary["elapsed_s"] = round(time.perf_counter() - started, 2)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="카카오톡 txt 여러 개를 한 번에 분석해서 화자별 JSONL 로 저장")
+    parser.add_argument("inputs", nargs="+", help="디렉터리, glob 패턴 또는 txt 파일 경로")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help="디렉터리 안에서 찾을 파일 패턴")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None, help="동시에 제출해 둘 파일 수 (기본: workers × 2)")
+    parser.add_argument("--no-ml", action="store_true", help="ML MBTI 예측 생략")
+    parser.add_argument("--trace", type=Path, default=None, help="파일별 단계 시간 trace 를 저장할 JSONL 경로")
+    parser.add_argument("--retry-errors", action="store_true", help="이전 실행에서 에러가 난 파일도 다시 분석")
+    args = parser.parse_args()
+
+    files = find_chat_files(args.inputs, args.pattern)
+    if not files:
+        parser.error("분석할 파일이 없습니다.")
+
+    summary = run_batch(
+        files,
+        output=args.output,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        use_ml=not args.no_ml,
+        retry_errors=args.retry_errors,
+        trace_path=args.trace,
+    )
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
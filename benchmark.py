@@ -0,0 +1,216 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from analysis import analyze_style, estimate_mbti, parse_kakao_chat
+from analysis_ml import predict_mbti_ml
+from emotion_analysis import analyze_emotions
+from synthetic_chat import CHAT_FORMATS, write_synthetic_chat
+
+# 벤치마크 기본 설정
+DEFAULT_LINES = [10_000, 100_000]
+DEFAULT_OUTPUT = Path("benchmark_results.json")
+# 비교 시 이 비율 이상 느려지거나 메모리가 늘면 회귀로 표시
+REGRESSION_THRESHOLD = 0.10
+
+
+# -----------------------------
+# 1. 단계별 측정
+# -----------------------------
+def measure(fn: Callable, repeat: int = 3, memory: bool = True) -> tuple:
+    """
+    fn 을 repeat 번 실행한 시간 (최소 / 중앙값) + tracemalloc 으로 잰 할당 최대치
+    반환: (측정값 dict, 마지막 실행 결과)
+    시간 측정은 tracemalloc 없이 따로 실행 (추적 오버헤드가 시간에 섞이지 않게)
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+
+    stats = {
+        "seconds_min": round(min(times), 4),
+        "seconds_median": round(float(np.median(times)), 4),
+    }
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats["peak_mb"] = round(peak / 2 ** 20, 2)
+
+    return stats, result
+
+
+def run_stages(path: Path, repeat: int = 3, memory: bool = True) -> Dict[str, Dict]:
+    """
+    parse → analyze_style → estimate_mbti → predict_mbti_ml → analyze_emotions 를 각각 측정
+    """
+    stages = {}
+    stages["parse"], df = measure(lambda: parse_kakao_chat(path, my_name=""), repeat, memory)
+    texts = df["message"].astype(str).tolist()
+
+    stages["analyze_style"], _ = measure(lambda: analyze_style(df), repeat, memory)
+    stages["estimate_mbti"], _ = measure(lambda: estimate_mbti(df), repeat, memory)
+    try:
+        stages["predict_mbti_ml"], _ = measure(lambda: predict_mbti_ml(texts), repeat, memory)
+    except FileNotFoundError as e:
+        stages["predict_mbti_ml"] = {"skipped": str(e)}
+    stages["analyze_emotions"], _ = measure(lambda: analyze_emotions(texts), repeat, memory)
+
+    for stats in stages.values():
+        if "seconds_min" in stats:
+            stats["messages_per_s"] = round(len(df) / stats["seconds_min"]) if stats["seconds_min"] else None
+    stages["parse"]["messages"] = int(len(df))
+    return stages
+
+
+def environment() -> Dict:
+    import sklearn
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def run_benchmark(
+    lines: List[int] = DEFAULT_LINES,
+    formats: List[str] = CHAT_FORMATS,
+    speakers: int = 5,
+    repeat: int = 3,
+    memory: bool = True,
+    **generator_kwargs,
+) -> Dict:
+    """
+    설정별 합성 대화를 만들어 단계별로 측정한 결과
+    반환: {"environment", "settings", "runs": {"export-10000": {단계: 측정값}}}
+    """
+    report = {
+        "environment": environment(),
+        "settings": {"lines": lines, "formats": formats, "speakers": speakers, "repeat": repeat, **generator_kwargs},
+        "runs": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            for n_lines in lines:
+                path = write_synthetic_chat(
+                    Path(tmp) / f"{fmt}-{n_lines}.txt", n_lines,
+                    n_speakers=speakers, fmt=fmt, **generator_kwargs,
+                )
+                name = f"{fmt}-{n_lines}"
+                print(f"⏱️ {name} ({path.stat().st_size / 2 ** 20:.1f} MB)")
+                report["runs"][name] = run_stages(path, repeat=repeat, memory=memory)
+                path.unlink()
+    return report
+
+
+def print_report(report: Dict) -> None:
+    print(f"{'run':>16} {'stage':>18} {'sec(min)':>10} {'peak MB':>9} {'msg/s':>11}")
+    for name, stages in report["runs"].items():
+        for stage, stats in stages.items():
+            print(
+                f"{name:>16} {stage:>18} {stats.get('seconds_min', '-'):>10} "
+                f"{stats.get('peak_mb', '-'):>9} {stats.get('messages_per_s', '-'):>11}"
+            )
+
+
+# -----------------------------
+# 2. 결과 비교
+# -----------------------------
+def compare_reports(base: Dict, new: Dict, threshold: float = REGRESSION_THRESHOLD) -> List[Dict]:
+    """
+    두 결과 파일의 같은 실행 / 단계끼리 시간 / 메모리 비율 (new / base)
+    threshold 이상 나빠진 항목은 regression=True
+    """
+    rows = []
+    for name, stages in new["runs"].items():
+        for stage, stats in stages.items():
+            old = base["runs"].get(name, {}).get(stage)
+            if not old:
+                continue
+            row = {"run": name, "stage": stage, "regression": False}
+            for key in ["seconds_min", "peak_mb"]:
+                if stats.get(key) is None or not old.get(key):
+                    continue
+                ratio = stats[key] / old[key]
+                row[key] = {"base": old[key], "new": stats[key], "ratio": round(ratio, 3)}
+                row["regression"] |= ratio > 1 + threshold
+            rows.append(row)
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> None:
+    print(f"{'run':>16} {'stage':>18} {'time x':>8} {'mem x':>8}")
+    for row in rows:
+        time_ratio = row.get("seconds_min", {}).get("ratio", "-")
+        mem_ratio = row.get("peak_mb", {}).get("ratio", "-")
+        mark = "  ⚠️ 회귀" if row["regression"] else ""
+        print(f"{row['run']:>16} {row['stage']:>18} {time_ratio:>8} {mem_ratio:>8}{mark}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="단계별 성능 측정 (합성 카카오톡 대화)")
+    parser.add_argument("--lines", type=int, nargs="+", default=DEFAULT_LINES, help="줄 수 (여러 개 가능, 10k ~ 10M)")
+    parser.add_argument("--formats", nargs="+", choices=CHAT_FORMATS, default=CHAT_FORMATS)
+    parser.add_argument("--speakers", type=int, default=5)
+    parser.add_argument("--multiline", type=float, default=0.05)
+    parser.add_argument("--emoji", type=float, default=0.1)
+    parser.add_argument("--lexicon", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc 메모리 측정 생략")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASE", "NEW"), help="두 결과 JSON 비교")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.compare:
+        base, new = (json.loads(path.read_text(encoding="utf-8")) for path in args.compare)
+        if base.get("settings") != new.get("settings"):
+            print("⚠️ 두 결과의 벤치마크 설정이 다릅니다. 수치를 직접 비교하기 어려울 수 있습니다.")
+        rows = compare_reports(base, new, args.threshold)
+        print_comparison(rows)
+        # 회귀가 있으면 종료 코드 1 (CI 등에서 확인용)
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+    report = run_benchmark(
+        lines=args.lines,
+        formats=args.formats,
+        speakers=args.speakers,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        multiline_ratio=args.multiline,
+        emoji_ratio=args.emoji,
+        lexicon_ratio=args.lexicon,
+    )
+    print_report(report)
+
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"✅ 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+
+from analysis import PARSER_VERSION, parse_kakao_chat
+
+# 파싱 결과 캐시 경로 / 최대 용량
+CACHE_DIR = Path(".cache/parsed_chats")
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+CACHE_SUFFIX = ".pkl"
+
+
+# -----------------------------
+# 1. 캐시 키
+# -----------------------------
+def chat_cache_key(raw_bytes: bytes) -> str:
+    """
+    업로드 원본 바이트 + 파서 버전으로 만든 캐시 키
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"parser-v{PARSER_VERSION}:".encode("utf-8"))
+    h.update(raw_bytes)
+    return h.hexdigest()
+
+
+# -----------------------------
+# 2. 읽기 / 쓰기 / 정리
+# -----------------------------
+def load_cached_chat(key: str, cache_dir: Path = CACHE_DIR) -> Optional[pd.DataFrame]:
+    """
+    캐시에 있으면 파싱된 DataFrame 반환, 없으면 None
+    읽을 때마다 mtime 을 갱신해서 LRU 순서로 사용
+    """
+    path = Path(cache_dir) / f"{key}{CACHE_SUFFIX}"
+    try:
+        with open(path, "rb") as f:
+            df = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # 깨진 캐시 파일은 지우고 다시 파싱
+        path.unlink(missing_ok=True)
+        return None
+
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+
+def store_cached_chat(
+    key: str,
+    df: pd.DataFrame,
+    cache_dir: Path = CACHE_DIR,
+    max_bytes: int = CACHE_MAX_BYTES,
+) -> None:
+    """
+    파싱된 DataFrame 을 캐시에 저장 (컬럼 블록 단위 pickle, protocol 5)
+    저장 후 전체 용량이 max_bytes 를 넘으면 오래 안 쓴 파일부터 삭제
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # 다른 세션이 같은 키를 동시에 쓰더라도 반쯤 쓴 파일이 보이지 않게 임시 파일 → rename
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(df, f, protocol=5)
+        os.replace(tmp_path, cache_dir / f"{key}{CACHE_SUFFIX}")
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    evict_chat_cache(cache_dir, max_bytes)
+
+
+def evict_chat_cache(cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES) -> int:
+    """
+    캐시 용량이 max_bytes 이하가 될 때까지 가장 오래 전에 쓴 파일부터 삭제
+    반환: 삭제한 파일 수
+    """
+    entries = []
+    for path in Path(cache_dir).glob(f"*{CACHE_SUFFIX}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+# -----------------------------
+# 3. 캐시를 거치는 파싱
+# -----------------------------
+def parse_kakao_chat_cached(
+    raw_bytes: bytes,
+    my_name: str,
+    cache_dir: Path = CACHE_DIR,
+    max_bytes: int = CACHE_MAX_BYTES,
+) -> pd.DataFrame:
+    """
+    같은 업로드(같은 바이트 + 같은 파서 버전)면 캐시에서 바로 읽고,
+    처음 보는 업로드면 parse_kakao_chat 으로 파싱한 뒤 캐시에 저장
+    """
+    key = chat_cache_key(raw_bytes)
+
+    df = load_cached_chat(key, cache_dir)
+    if df is not None:
+        return df
+
+    df = parse_kakao_chat(raw_bytes, my_name=my_name)
+    store_cached_chat(key, df, cache_dir, max_bytes)
+    return df
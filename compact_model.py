@@ -0,0 +1,88 @@
+import numpy as np
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+# 해시 특징 + 양자화 계수로 저장한 가벼운 모델 (train_mbti_model.py --compact 로 생성)
+COMPACT_MODEL_PATH = Path("models/mbti_model_compact.npz")
+
+
+# -----------------------------
+# 압축 모델 추론
+# -----------------------------
+class CompactModel:
+    """
+    models/mbti_model_compact.npz 를 읽어서 predict_proba 수행
+    - 특징: HashingVectorizer (어휘 사전 없음) + 저장된 IDF (학습에 나온 버킷만, 나머지는 idf_default)
+    - 계수: 학습에 나온 버킷 열만, int8 (클래스별 스케일) 또는 float32
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.classes_ = arrays["classes"]
+        self.buckets = arrays["buckets"]
+        self.idf = arrays["idf"]
+        self.idf_default = float(arrays["idf_default"])
+        self.intercept = arrays["intercept"]
+
+        if "coef_q" in arrays:
+            # int8 → float32 복원 (클래스별 스케일)
+            self.coef = arrays["coef_q"].astype(np.float32) * arrays["coef_scale"][:, None]
+        else:
+            self.coef = arrays["coef"]
+
+        ngram_min, ngram_max = (int(n) for n in arrays["ngram_range"])
+        self.vectorizer = HashingVectorizer(
+            n_features=int(arrays["n_features"]),
+            ngram_range=(ngram_min, ngram_max),
+            alternate_sign=False,
+            norm=None,
+        )
+
+    @classmethod
+    def load(cls, path: Path = COMPACT_MODEL_PATH) -> "CompactModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def transform(self, texts: List[str]):
+        """
+        TF-IDF (l2 정규화) 후 학습에 나온 버킷 열만 남긴 희소 행렬
+        """
+        X = self.vectorizer.transform(texts).tocsr().astype(np.float32)
+
+        # 버킷별 IDF: 학습에 나온 버킷이면 저장된 값, 아니면 idf_default (정규화 분모에는 포함됨)
+        pos = np.searchsorted(self.buckets, X.indices)
+        pos = np.minimum(pos, len(self.buckets) - 1)
+        known = self.buckets[pos] == X.indices
+        X.data *= np.where(known, self.idf[pos], self.idf_default)
+        X = normalize(X, norm="l2", copy=False)
+
+        return X[:, self.buckets]
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        logits = self.transform(texts) @ self.coef.T + self.intercept
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+
+@lru_cache(maxsize=None)
+def load_compact_model(path: Path = COMPACT_MODEL_PATH) -> CompactModel:
+    return CompactModel.load(path)
+
+
+def predict_mbti_compact(texts: List[str], path: Path = COMPACT_MODEL_PATH) -> Dict:
+    """
+    predict_mbti_ml 과 같은 형태의 결과를 압축 모델로 계산
+    """
+    model = load_compact_model(path)
+    proba = model.predict_proba([" ".join(texts)])[0]
+    best = int(proba.argmax())
+
+    return {
+        "mbti": str(model.classes_[best]),
+        "confidence": round(float(proba[best]), 3),
+    }
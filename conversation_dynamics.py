@@ -0,0 +1,159 @@
+import re
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# 이 시간 이상 대화가 끊기면 다음 메시지를 새 대화의 시작(먼저 말 건 것)으로 봄
+SESSION_GAP = pd.Timedelta(hours=6)
+
+# 답장 시간 분포 구간 (초): 1분 / 5분 / 30분 / 1시간 / 6시간 / 그 이상
+LATENCY_BINS = np.array([0, 60, 300, 1800, 3600, 6 * 3600, np.inf])
+
+# 호감도(재미용) 키워드
+POSITIVE_KEYWORDS = [
+    "좋아", "좋아해", "좋아용",
+    "사랑", "사랑해",
+    "보고싶", "보고 싶",
+    "고마워", "고맙",
+    "귀여워", "귀엽", "예쁘", "이쁘", "멋있",
+    "행복", "즐거웠", "기뻐",
+    "❤️", "💖", "💕", "💗",
+]
+POSITIVE_PATTERN = "|".join(re.escape(kw) for kw in POSITIVE_KEYWORDS)
+
+# 답장이 이보다 적은 쌍은 호감도를 계산하지 않음 (NaN)
+MIN_REPLIES = 5
+
+
+# -----------------------------
+# 1. 답장 / 턴 / 먼저 말 걸기 행렬
+# -----------------------------
+def _pair_matrix(values: pd.Series, n: int, fill=0.0) -> np.ndarray:
+    # (행 화자 * n + 열 화자) 로 묶인 값 → n × n 행렬
+    matrix = np.full(n * n, fill, dtype=np.float64)
+    matrix[values.index.to_numpy()] = values.to_numpy()
+    return matrix.reshape(n, n)
+
+
+def conversation_dynamics(df: pd.DataFrame, session_gap: pd.Timedelta = SESSION_GAP) -> Dict:
+    """
+    파싱된 대화(datetime / speaker / message)에서 화자 × 화자 관계 통계를 한 번에 계산
+    시간순 정렬 한 번 + 벡터 연산만 사용 (화자 수와 상관없이 메시지 수에 비례)
+
+    모든 행렬은 행 화자 → 열 화자 방향:
+    - replies[b, a]: a 의 턴 바로 다음에 b 가 이어서 말한 횟수 (턴 교대)
+    - latency_median / latency_mean / latency_p90[b, a]: b 가 a 에게 답장하기까지 걸린 시간(초)
+    - latency_hist: [화자, 화자, 구간] 답장 시간 분포 (구간 경계는 latency_bins)
+    - initiations[b, a]: b 가 먼저 말을 건 대화에 a 가 참여한 횟수
+    - positive_replies[b, a]: b 가 a 에게 이어서 보낸 메시지 중 호감 키워드가 있는 메시지 수
+    - reply_messages[b, a]: b 가 a 에게 이어서 보낸 메시지 수
+    """
+    data = df.loc[df["datetime"].notna(), ["datetime", "speaker", "message"]]
+    data = data.sort_values("datetime", kind="stable")
+
+    codes, speakers = pd.factorize(data["speaker"].astype(str), sort=True)
+    n = len(speakers)
+    times = data["datetime"].to_numpy(dtype="datetime64[ns]")
+    positive = data["message"].astype(str).str.contains(POSITIVE_PATTERN, regex=True).to_numpy()
+
+    result = {"speakers": list(speakers), "latency_bins": LATENCY_BINS}
+    if len(codes) == 0:
+        empty = np.zeros((0, 0))
+        for key in ["replies", "latency_median", "latency_mean", "latency_p90", "initiations",
+                    "positive_replies", "reply_messages"]:
+            result[key] = pd.DataFrame(empty)
+        result["latency_hist"] = np.zeros((0, 0, len(LATENCY_BINS) - 1))
+        result["sessions_started"] = pd.Series(dtype=np.int64, name="sessions_started")
+        return result
+
+    prev = np.r_[-1, codes[:-1]]
+    gaps = np.r_[np.inf, np.diff(times).astype("timedelta64[ns]").astype(np.float64) / 1e9]
+
+    # 턴 교대: 앞 메시지와 화자가 다르면 새 턴 (앞 화자 → 이번 화자로 답장)
+    turn_start = codes != prev
+    reply = turn_start & (prev >= 0)
+    pair = codes * n + prev  # 행: 답장한 사람, 열: 받은 사람
+    reply_pairs = pd.Series(gaps[reply], index=pair[reply])
+
+    by_pair = reply_pairs.groupby(level=0)
+    result["replies"] = _pair_matrix(by_pair.size(), n)
+    result["latency_median"] = _pair_matrix(by_pair.median(), n, np.nan)
+    result["latency_mean"] = _pair_matrix(by_pair.mean(), n, np.nan)
+    result["latency_p90"] = _pair_matrix(by_pair.quantile(0.9), n, np.nan)
+
+    bins = np.digitize(reply_pairs.to_numpy(), LATENCY_BINS[1:-1])
+    hist = np.bincount(pair[reply] * (len(LATENCY_BINS) - 1) + bins, minlength=n * n * (len(LATENCY_BINS) - 1))
+    result["latency_hist"] = hist.reshape(n, n, len(LATENCY_BINS) - 1)
+
+    # 턴에 속한 모든 메시지가 누구에게 이어서 보낸 것인지 (턴 시작 시점의 앞 화자)
+    turn_id = np.cumsum(turn_start) - 1
+    turn_partner = np.where(reply, prev, -1)[turn_start][turn_id]
+    answered = turn_partner >= 0
+    message_pair = codes[answered] * n + turn_partner[answered]
+    result["reply_messages"] = np.bincount(message_pair, minlength=n * n).reshape(n, n).astype(np.float64)
+    result["positive_replies"] = np.bincount(
+        message_pair, weights=positive[answered], minlength=n * n
+    ).reshape(n, n)
+
+    # 먼저 말 걸기: session_gap 이상 쉬었다가 시작한 대화의 첫 화자 → 그 대화에 참여한 다른 화자
+    session_start = gaps >= session_gap.total_seconds()
+    session_id = np.cumsum(session_start) - 1
+    joined = np.unique(session_id * n + codes)
+    joined_session, joined_code = np.divmod(joined, n)
+    initiator_of = codes[session_start][joined_session]
+    other = joined_code != initiator_of
+    result["initiations"] = np.bincount(
+        initiator_of[other] * n + joined_code[other], minlength=n * n
+    ).reshape(n, n).astype(np.float64)
+    result["sessions_started"] = pd.Series(
+        np.bincount(codes[session_start], minlength=n), index=speakers, name="sessions_started"
+    )
+
+    for key in ["replies", "latency_median", "latency_mean", "latency_p90", "initiations",
+                "positive_replies", "reply_messages"]:
+        result[key] = pd.DataFrame(result[key], index=speakers, columns=speakers)
+    return result
+
+
+# -----------------------------
+# 2. 관계 지표 (호감도 등)
+# -----------------------------
+def relationship_metrics(dynamics: Dict, min_replies: int = MIN_REPLIES) -> Dict[str, pd.DataFrame]:
+    """
+    conversation_dynamics 결과로 모든 화자 쌍의 관계 지표 계산 (행 화자 → 열 화자)
+    - responsiveness: a 의 턴 중 b 가 바로 이어서 답한 비율
+    - initiative: b 와 a 사이에서 b 가 먼저 말을 건 비율
+    - positive_ratio: b 가 a 에게 이어서 보낸 메시지 중 호감 키워드 비율
+    - affinity: 호감도(재미용, 0~100) = 20 + 80 × (0.5 × positive_ratio + 0.25 × responsiveness + 0.25 × initiative)
+      답장 수가 min_replies 보다 적은 쌍은 NaN
+    """
+    replies = dynamics["replies"]
+    initiations = dynamics["initiations"]
+
+    # a 의 턴 수 = a 다음에 누군가 이어서 말한 횟수 (열 방향 합)
+    turns_received = replies.sum(axis=0)
+    responsiveness = replies.div(turns_received.where(turns_received > 0), axis=1)
+
+    mutual = initiations + initiations.T
+    initiative = (initiations / mutual.where(mutual > 0)).fillna(0.5)
+
+    reply_messages = dynamics["reply_messages"]
+    positive_ratio = dynamics["positive_replies"] / reply_messages.where(reply_messages > 0)
+
+    affinity = 20 + 80 * (0.5 * positive_ratio + 0.25 * responsiveness.fillna(0) + 0.25 * initiative)
+    affinity = affinity.clip(0.0, 100.0).round(1).where(replies >= min_replies)
+
+    return {
+        "responsiveness": responsiveness,
+        "initiative": initiative,
+        "positive_ratio": positive_ratio,
+        "affinity": affinity,
+    }
+
+
+def affinity_matrix(df: pd.DataFrame, session_gap: pd.Timedelta = SESSION_GAP) -> pd.DataFrame:
+    """
+    모든 화자 쌍의 호감도 행렬 (affinity.loc[b, a]: b 가 a 에게 가진 호감도)
+    """
+    return relationship_metrics(conversation_dynamics(df, session_gap))["affinity"]
@@ -1,7 +1,13 @@
 from typing import List, Dict
-from collections import Counter
 import re
 
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from instrumentation import span
+from multipattern import AhoCorasick
+
 
 # 간단 감정 키워드 사전 (추후 고도화 가능)
 EMOTION_LEXICON = {
@@ -12,31 +18,228 @@ EMOTION_LEXICON = {
     "중립": []
 }
 
-def detect_emotion(sentence: str) -> str:
-    for emotion, keywords in EMOTION_LEXICON.items():
-        for kw in keywords:
-            if kw in sentence:
-                return emotion
-    return "중립"
 
+NEUTRAL = "중립"
+
+
+def build_emotion_matcher(lexicon: Dict[str, List[str]]):
+    """
+    감정 사전 전체를 하나의 Aho-Corasick 자동자로 묶음
+    반환: (자동자, 키워드 id → 감정 번호 목록, 감정 이름 목록)
+    """
+    emotions = list(lexicon.keys())
+    terms = []
+    term_emotion = []
+    for idx, emotion in enumerate(emotions):
+        for kw in lexicon[emotion]:
+            terms.append(kw)
+            term_emotion.append(idx)
+    return AhoCorasick(terms), term_emotion, emotions
+
+
+_MATCHER, _TERM_EMOTION, _EMOTIONS = build_emotion_matcher(EMOTION_LEXICON)
+
+
+def count_emotions(sentence: str) -> Dict[str, int]:
+    """
+    문장을 한 번만 훑어서 감정별 키워드 등장 횟수 반환 (사전 순서, 0 포함)
+    """
+    counts = [0] * len(_EMOTIONS)
+    for pid, n in _MATCHER.count(sentence).items():
+        counts[_TERM_EMOTION[pid]] += n
+    return dict(zip(_EMOTIONS, counts))
+
+
+def pick_emotion(counts: Dict[str, int], first_match: bool = False) -> str:
+    """
+    감정별 횟수에서 대표 감정 선택
+    기본: 가장 많이 나온 감정 (같으면 사전 순서가 앞선 감정)
+    first_match=True: 예전 방식처럼 사전 순서상 처음 걸린 감정
+    """
+    best = NEUTRAL
+    best_count = 0
+    for emotion, n in counts.items():
+        if n > best_count:
+            best, best_count = emotion, n
+            if first_match:
+                break
+    return best
+
+
+def detect_emotion(sentence: str, first_match: bool = False) -> str:
+    return pick_emotion(count_emotions(sentence), first_match=first_match)
+
+
+def emotion_term_hits(sentence: str) -> Dict[int, int]:
+    """
+    문장 하나의 사전 키워드 id → 등장 횟수 (emotion_term_matrix 의 한 행)
+    """
+    return _MATCHER.count(sentence)
+
+
+def build_term_matrix(indptr: List[int], indices: List[int], data: List[int]) -> sparse.csr_matrix:
+    """
+    행마다 모은 emotion_term_hits 결과로 문장 × 키워드 CSR 행렬 생성
+    """
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.int64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(_TERM_EMOTION)),
+    )
+
+
+def emotion_term_matrix(texts) -> sparse.csr_matrix:
+    """
+    문장 × 사전 키워드 등장 횟수 희소 행렬 (문장마다 자동자로 한 번씩만 훑음)
+    """
+    count = _MATCHER.count
+    indptr = [0]
+    indices = []
+    data = []
+
+    for sentence in pd.Series(texts, dtype=object).astype(str).tolist():
+        hits = count(sentence)
+        indices.extend(hits.keys())
+        data.extend(hits.values())
+        indptr.append(len(indices))
+
+    return build_term_matrix(indptr, indices, data)
+
+
+def term_emotion_matrix() -> sparse.csr_matrix:
+    """
+    사전 키워드 × 감정 (키워드가 속한 감정이면 1)
+    """
+    n_terms = len(_TERM_EMOTION)
+    return sparse.csr_matrix(
+        (np.ones(n_terms, dtype=np.int64), (np.arange(n_terms), np.asarray(_TERM_EMOTION, dtype=np.int64))),
+        shape=(n_terms, len(_EMOTIONS)),
+    )
 
-def analyze_emotions(texts: List[str]) -> Dict:
+
+def count_emotions_batch(texts) -> pd.DataFrame:
+    """
+    여러 문장(Series / 리스트)의 감정별 키워드 등장 횟수
+    반환: 문장 × 감정 DataFrame (index 는 입력 Series 와 같음)
+    """
+    texts = pd.Series(texts, dtype=object)
+    counts = (emotion_term_matrix(texts) @ term_emotion_matrix()).toarray()
+    return pd.DataFrame(counts, index=texts.index, columns=_EMOTIONS)
+
+
+def label_emotions(counts: np.ndarray, first_match: bool = False) -> np.ndarray:
+    """
+    문장 × 감정 횟수 행렬에서 문장별 대표 감정 번호 (_EMOTIONS 기준, pick_emotion 과 같은 규칙)
+    """
+    if first_match:
+        picked = (counts > 0).argmax(axis=1)
+    else:
+        picked = counts.argmax(axis=1)
+
+    has_hit = counts.max(axis=1, initial=0) > 0
+    return np.where(has_hit, picked, _EMOTIONS.index(NEUTRAL))
+
+
+def detect_emotions_batch(texts, first_match: bool = False) -> pd.Series:
+    """
+    여러 문장의 대표 감정을 한 번에 판정 (detect_emotion 과 같은 규칙)
+    """
+    counts = count_emotions_batch(texts)
+    labels = label_emotions(counts.to_numpy(), first_match=first_match)
+    return pd.Series(np.asarray(_EMOTIONS, dtype=object)[labels], index=counts.index, dtype=object)
+
+
+def speaker_emotion_table(
+    term_matrix: sparse.csr_matrix, codes: np.ndarray, n_speakers: int, first_match: bool = False
+) -> tuple:
+    """
+    화자별 감정 집계를 희소 행렬 곱으로 한 번에 계산
+    term_matrix: 문장 × 키워드 (emotion_term_matrix)
+    codes: 문장별 화자 번호 (0..n_speakers-1, 제외할 문장은 -1)
+    first_match: True 면 문장마다 사전 순서상 처음 걸린 감정 (예전 detect_emotion 방식)
+    반환: (화자 × 감정 문장 수, 화자 × 감정 처음 나온 문장 위치(없으면 -1))
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    n_emotions = len(_EMOTIONS)
+
+    message_emotions = (term_matrix @ term_emotion_matrix()).toarray()
+    labels = label_emotions(message_emotions, first_match=first_match)
+
+    rows = np.flatnonzero(codes >= 0)
+    # 화자 × 문장 지시 행렬 @ 문장 × 감정 원-핫 = 화자 × 감정 문장 수
+    speaker_rows = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (codes[rows], rows)),
+        shape=(n_speakers, len(codes)),
+    )
+    onehot = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int64), (np.arange(len(codes)), labels)),
+        shape=(len(codes), n_emotions),
+    )
+    counts = (speaker_rows @ onehot).toarray()
+
+    # (화자, 감정) 조합별 첫 문장 위치
+    first_rows = np.full((n_speakers, n_emotions), -1, dtype=np.int64)
+    keys, first = np.unique(codes[rows] * n_emotions + labels[rows], return_index=True)
+    first_rows[keys // n_emotions, keys % n_emotions] = rows[first]
+
+    return counts, first_rows
+
+
+def analyze_emotions_frame(df: pd.DataFrame, partition=None, first_match: bool = False) -> Dict[str, Dict]:
+    """
+    파싱된 대화 전체를 한 번에 분석해서 화자별 analyze_emotions 결과 반환
+    partition (SpeakerPartition) 을 주면 화자 번호를 다시 계산하지 않음
+    first_match=True 면 문장 감정을 예전처럼 처음 걸린 감정으로 판정
+    """
+    texts = df["message"].astype(str).tolist()
+    if partition is not None:
+        codes, speakers = partition.codes, partition.speakers
+    else:
+        codes, speakers = pd.factorize(df["speaker"], sort=True)
+    with span("emotions", rows=len(texts), speakers=len(speakers)):
+        counts, first_rows = speaker_emotion_table(
+            emotion_term_matrix(texts), codes, len(speakers), first_match=first_match
+        )
+
+    results = {}
+    for code, name in enumerate(speakers):
+        present = np.flatnonzero(first_rows[code] >= 0)
+        if len(present) == 0:
+            continue
+        # 감정은 처음 등장한 순서대로
+        present = present[np.argsort(first_rows[code, present], kind="stable")]
+        results[name] = summarize_emotions(
+            {_EMOTIONS[e]: int(counts[code, e]) for e in present},
+            {_EMOTIONS[e]: texts[first_rows[code, e]] for e in present},
+        )
+    return results
+
+
+def analyze_emotions(texts: List[str], first_match: bool = False) -> Dict:
+    """
+    문장 목록의 감정 분포 / 상위 감정 / 대표 문장 / 요약
+    문장 감정은 키워드가 가장 많이 걸린 감정 (first_match=True 면 예전처럼 처음 걸린 감정)
+    """
     if not texts:
         return {}
 
-    emotion_results = []
-    example_sentences = {}
+    # 순환 import 방지 (features 가 이 모듈의 사전/판별 함수를 사용)
+    from features import extract_features, emotions_from_features
 
-    for text in texts:
-        emo = detect_emotion(text)
-        emotion_results.append(emo)
-        if emo not in example_sentences:
-            example_sentences[emo] = text
+    with span("emotions", rows=len(texts)):
+        features = extract_features(texts, scans=["emotions"], first_match=first_match)
+        return emotions_from_features(features.iloc[0])
 
-    counter = Counter(emotion_results)
-    total = sum(counter.values())
 
-    distribution = {emo: round(cnt / total, 3) for emo, cnt in counter.items()}
+def summarize_emotions(counts: Dict[str, int], example_sentences: Dict[str, str]) -> Dict:
+    """
+    counts: 감정별 문장 수 (처음 등장한 순서대로)
+    example_sentences: 감정별 처음 등장한 문장
+    """
+    total = sum(counts.values())
+    if total == 0:
+        return {}
+
+    distribution = {emo: round(cnt / total, 3) for emo, cnt in counts.items()}
 
     top_sorted = sorted(distribution.items(), key=lambda x: x[1], reverse=True)
     top_emotions = dict(top_sorted[:3])
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+from emotion_analysis import (
+    EMOTION_LEXICON,
+    emotion_term_matrix,
+    speaker_emotion_table,
+    summarize_emotions,
+)
+from instrumentation import span
+from partition import SpeakerPartition
+from rule_engine import MBTI_LETTERS, load_rule_engine
+
+# -----------------------------
+# 1. 한 번에 계산하는 특징 목록
+# -----------------------------
+# analyze_style / estimate_mbti / analyze_emotions 가 쓰는 값을 화자별로 한 표에 모아 둠
+# (특징 묶음마다 메시지를 따로 훑고, 고른 묶음만 계산)
+EMOJI_PATTERN = re.compile(r"[ㅋㅎㅠㅜ]")
+
+EMOTIONS = list(EMOTION_LEXICON.keys())
+
+COUNT_COLUMNS = (
+    ["n_messages", "n_chars", "n_emoji", "n_question", "n_exclaim"]
+    + [f"emotion_{emo}" for emo in EMOTIONS]
+)
+# 규칙 엔진 키워드의 글자별 (등장 횟수 × 가중치) 합
+RULE_COLUMNS = [f"rule_{letter}" for letter in MBTI_LETTERS]
+# 감정별로 처음 등장한 메시지 순번 (화자 안에서, 없으면 -1) / 그 문장
+FIRST_COLUMNS = [f"first_{emo}" for emo in EMOTIONS]
+EXAMPLE_COLUMNS = [f"example_{emo}" for emo in EMOTIONS]
+
+FEATURE_COLUMNS = COUNT_COLUMNS + RULE_COLUMNS + FIRST_COLUMNS + EXAMPLE_COLUMNS
+
+# extract_features 에서 골라 계산할 수 있는 묶음
+# - style: 길이 / 이모티콘 / 질문·감탄 (analyze_style)
+# - rules: 규칙 키워드 + 글자 수 (estimate_mbti)
+# - emotions: 감정 키워드 (analyze_emotions)
+FEATURE_SCANS = ("style", "rules", "emotions")
+
+
+def feature_fingerprint() -> str:
+    """
+    특징 값을 바꾸는 입력(규칙 파일 / 감정 사전 / 이모티콘 패턴)의 해시
+    저장해 둔 특징 표를 새로 계산한 값과 합쳐도 되는지 확인할 때 사용
+    """
+    h = hashlib.sha256()
+    h.update(load_rule_engine().digest.encode("utf-8"))
+    h.update(json.dumps(EMOTION_LEXICON, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    h.update(EMOJI_PATTERN.pattern.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def extract_features(
+    messages: Iterable[str],
+    speakers: Optional[Iterable] = None,
+    partition: Optional[SpeakerPartition] = None,
+    scans: Iterable[str] = FEATURE_SCANS,
+    first_match: bool = False,
+) -> pd.DataFrame:
+    """
+    화자별 특징 표를 만듦 (scans 로 고른 묶음마다 메시지를 한 번씩 훑음)
+    speakers 가 없으면 전체를 한 그룹("")으로 계산
+    partition 을 주면 화자 번호를 다시 계산하지 않고 그대로 사용
+    scans 로 계산할 묶음만 고를 수 있음 (FEATURE_SCANS 참고, 빠진 묶음의 열은 0 / -1 / None)
+    first_match: 문장 감정 판정 방식 (speaker_emotion_table 참고)
+    반환: index=speaker, columns=FEATURE_COLUMNS
+    """
+    scans = set(scans)
+    unknown = scans - set(FEATURE_SCANS)
+    if unknown:
+        raise ValueError(f"알 수 없는 scans: {sorted(unknown)} (가능: {FEATURE_SCANS})")
+
+    messages = pd.Series(messages, dtype=object)
+    if partition is not None:
+        codes, groups = partition.codes, pd.Index(partition.speakers, dtype=object)
+        speakers = partition.speakers
+    elif speakers is None:
+        codes = np.zeros(len(messages), dtype=np.int64)
+        groups = pd.Index([""])
+    else:
+        codes, groups = pd.factorize(pd.Series(speakers), sort=True)
+        groups = pd.Index(list(groups), dtype=object)
+
+    n_groups = len(groups)
+    texts = messages.astype(str).tolist()
+    valid = codes >= 0
+    valid_codes = codes[valid]
+
+    def count_by_speaker(values) -> np.ndarray:
+        # 메시지별 값을 화자별로 합산 (화자가 없는 행은 제외)
+        values = np.fromiter(values, dtype=np.int64, count=len(texts))[valid]
+        return np.bincount(valid_codes, weights=values, minlength=n_groups).astype(np.int64)
+
+    counts = {col: np.zeros(n_groups, dtype=np.int64) for col in COUNT_COLUMNS}
+    counts["n_messages"] = np.bincount(valid_codes, minlength=n_groups).astype(np.int64)
+
+    # 길이 / 이모티콘 / 문장부호는 가벼운 연산이라 따로 한 번씩 (규칙 점수도 전체 글자 수가 필요)
+    if "style" in scans or "rules" in scans:
+        counts["n_chars"] = count_by_speaker(len(msg) for msg in texts)
+    if "style" in scans:
+        findall = EMOJI_PATTERN.findall
+        counts["n_emoji"] = count_by_speaker(len(findall(msg)) for msg in texts)
+        counts["n_question"] = count_by_speaker("?" in msg for msg in texts)
+        counts["n_exclaim"] = count_by_speaker("!" in msg for msg in texts)
+
+    rules = {letter: [0.0] * n_groups for letter in MBTI_LETTERS}
+    if "rules" in scans:
+        letter_hits = load_rule_engine().letter_hits
+        for code, msg in zip(codes.tolist(), texts):
+            if code < 0:
+                continue
+            for letter, weight in letter_hits(msg).items():
+                rules[letter][code] += weight
+
+    if "emotions" in scans:
+        # 감정 키워드는 문장 × 키워드 희소 행렬로 모아 두고 한 번에 집계 (화자가 없는 행은 집계에서 제외)
+        emotion_counts, first_rows = speaker_emotion_table(
+            emotion_term_matrix(texts), codes, n_groups, first_match=first_match
+        )
+    else:
+        emotion_counts = np.zeros((n_groups, len(EMOTIONS)), dtype=np.int64)
+        first_rows = np.full((n_groups, len(EMOTIONS)), -1, dtype=np.int64)
+    # 전체 행 번호 → 화자 안에서의 순번 (병합할 때 앞 구간 메시지 수만큼 밀 수 있도록)
+    ordinal = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+
+    table = pd.DataFrame(counts, index=groups, dtype=np.int64)
+    for e, emo in enumerate(EMOTIONS):
+        table[f"emotion_{emo}"] = emotion_counts[:, e]
+    for letter in MBTI_LETTERS:
+        table[f"rule_{letter}"] = np.asarray(rules[letter], dtype=np.float64)
+    for e, emo in enumerate(EMOTIONS):
+        rows = first_rows[:, e]
+        table[f"first_{emo}"] = np.where(rows >= 0, ordinal[np.maximum(rows, 0)] if len(ordinal) else -1, -1)
+    for e, emo in enumerate(EMOTIONS):
+        rows = first_rows[:, e]
+        table[f"example_{emo}"] = pd.Series([texts[r] if r >= 0 else None for r in rows], index=groups, dtype=object)
+    table.index.name = "speaker"
+
+    # 메시지가 하나도 없는 화자는 제외 (speakers 없이 빈 입력이면 0 행 하나 유지)
+    if speakers is not None:
+        table = table[table["n_messages"] > 0]
+    return table
+
+
+def extract_speaker_features(
+    df: pd.DataFrame, partition: Optional[SpeakerPartition] = None, first_match: bool = False
+) -> pd.DataFrame:
+    """
+    파싱된 대화 DataFrame 에서 화자별 특징 표 계산 (감정 / 규칙 키워드 스캔 포함)
+    """
+    with span("features", rows=len(df)):
+        if partition is not None:
+            return extract_features(df["message"], partition=partition, first_match=first_match)
+        return extract_features(df["message"], df["speaker"], first_match=first_match)
+
+
+def merge_features(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """
+    앞부분 대화의 특징 표 a 와 그 뒤에 이어지는 대화의 특징 표 b 를 합침
+    결과는 두 구간을 이어 붙여 한 번에 extract_features 한 것과 같음
+    """
+    index = a.index.union(b.index)
+    a = a.reindex(index)
+    b = b.reindex(index)
+
+    merged = a[COUNT_COLUMNS].fillna(0).astype(np.int64) + b[COUNT_COLUMNS].fillna(0).astype(np.int64)
+    for col in RULE_COLUMNS:
+        merged[col] = a[col].fillna(0.0) + b[col].fillna(0.0)
+
+    a_messages = a["n_messages"].fillna(0).astype(np.int64)
+    for emo in EMOTIONS:
+        a_first = a[f"first_{emo}"].fillna(-1).astype(np.int64)
+        b_first = b[f"first_{emo}"].fillna(-1).astype(np.int64)
+        # 앞 구간에 이미 있으면 그대로, 없으면 뒤 구간 순번을 앞 구간 메시지 수만큼 밀어서 사용
+        use_a = a_first >= 0
+        merged[f"first_{emo}"] = np.where(use_a, a_first, np.where(b_first >= 0, b_first + a_messages, -1))
+    for emo in EMOTIONS:
+        use_a = a[f"first_{emo}"].fillna(-1) >= 0
+        merged[f"example_{emo}"] = a[f"example_{emo}"].where(use_a, b[f"example_{emo}"]).astype(object)
+
+    merged.index.name = "speaker"
+    return merged
+
+
+def features_to_dict(features: pd.DataFrame) -> Dict:
+    """
+    특징 표를 JSON 으로 저장할 수 있는 dict 로 변환
+    """
+    return {
+        "index": [str(name) for name in features.index],
+        "columns": list(features.columns),
+        "data": features.astype(object).where(features.notna(), None).values.tolist(),
+    }
+
+
+def features_from_dict(data: Dict) -> pd.DataFrame:
+    """
+    features_to_dict 의 역변환
+    """
+    table = pd.DataFrame(data["data"], index=pd.Index(data["index"], name="speaker"), columns=data["columns"])
+    for col in COUNT_COLUMNS + FIRST_COLUMNS:
+        table[col] = table[col].astype(np.int64)
+    for col in RULE_COLUMNS:
+        table[col] = table[col].astype(np.float64)
+    for col in EXAMPLE_COLUMNS:
+        table[col] = table[col].astype(object)
+    return table
+
+
+# -----------------------------
+# 2. 기존 결과 형태로 보기
+# -----------------------------
+def style_from_features(row: pd.Series) -> Dict:
+    """
+    analyze_style 과 같은 결과
+    """
+    total = int(row["n_messages"])
+    if total == 0:
+        return {}
+
+    return {
+        "평균 문장 길이": round(row["n_chars"] / total, 2),
+        "이모티콘/감정표현 수": int(row["n_emoji"]),
+        "질문 비율": round(row["n_question"] / total, 3),
+        "감탄 비율": round(row["n_exclaim"] / total, 3),
+    }
+
+
+def mbti_from_features(row: pd.Series) -> Dict:
+    """
+    estimate_mbti 와 같은 결과 (규칙 엔진으로 판정)
+    """
+    letter_weights = {letter: row[f"rule_{letter}"] for letter in MBTI_LETTERS}
+    return load_rule_engine().score(int(row["n_messages"]), int(row["n_chars"]), letter_weights)
+
+
+def emotions_from_features(row: pd.Series) -> Dict:
+    """
+    analyze_emotions 와 같은 결과 (감정은 처음 등장한 순서대로)
+    """
+    present = [emo for emo in EMOTIONS if row[f"first_{emo}"] >= 0]
+    present.sort(key=lambda emo: row[f"first_{emo}"])
+
+    counts = {emo: int(row[f"emotion_{emo}"]) for emo in present}
+    examples = {emo: row[f"example_{emo}"] for emo in present}
+    return summarize_emotions(counts, examples)
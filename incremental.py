@@ -0,0 +1,244 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from analysis import (
+    PARSER_VERSION,
+    build_chat_frame,
+    iter_kakao_lines,
+    iter_record_batches,
+    match_line,
+    sniff_encoding,
+)
+from features import (
+    emotions_from_features,
+    extract_features,
+    feature_fingerprint,
+    features_from_dict,
+    features_to_dict,
+    mbti_from_features,
+    merge_features,
+    style_from_features,
+)
+
+# 매주 다시 내보낸 같은 대화방을, 지난번 내보내기 뒤에 붙은 부분만 파싱해서 갱신
+STATE_VERSION = 2
+
+# 지난번 내보내기의 마지막 몇 줄을 기준점(anchor)으로 저장해서 새 내보내기 안에서 찾음
+ANCHOR_LINES = 5
+
+
+# -----------------------------
+# 1. 상태 만들기
+# -----------------------------
+class _DayTracker:
+    """
+    줄을 그대로 흘려보내면서 마지막 날짜 구분선을 기억
+    """
+
+    def __init__(self, lines: Iterable[str], day: Optional[str] = None):
+        self.lines = lines
+        self.day = day
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.lines:
+            stripped = line.strip()
+            if stripped.startswith("-") or stripped[:1].isdigit():
+                kind, value = match_line(stripped)
+                if kind == "date":
+                    self.day = value
+            yield line
+
+
+def _scan(lines: Iterable[str], day: Optional[str], features=None) -> Tuple:
+    """
+    줄들을 배치 단위로 파싱하면서 특징 표를 누적
+    반환: (features, 마지막 날짜, 메시지 수)
+    """
+    tracker = _DayTracker(lines, day)
+    n_records = 0
+
+    for batch in iter_record_batches(tracker, day=day):
+        frame = build_chat_frame(batch)
+        batch_features = extract_features(frame["message"], frame["speaker"])
+        features = batch_features if features is None else merge_features(features, batch_features)
+        n_records += len(batch)
+
+    if features is None:
+        features = extract_features([], [])
+    return features, tracker.day, n_records
+
+
+def _decode_encoding(raw_bytes: bytes) -> str:
+    encoding = sniff_encoding(raw_bytes)
+    return "utf-8" if encoding == "utf-8-sig" else encoding
+
+
+def read_anchor(raw_bytes: bytes, window: int = 64 * 1024) -> str:
+    """
+    파일 끝의 비어 있지 않은 줄 ANCHOR_LINES 개 (줄바꿈 포함 원문 그대로)
+    끝부분만 읽고, CP949 에서도 글자가 어긋나지 않게 줄 경계에서부터 디코딩
+    """
+    encoding = _decode_encoding(raw_bytes)
+    start = len(raw_bytes)
+
+    while True:
+        start = max(0, start - window)
+        if start > 0:
+            start = raw_bytes.rfind(b"\n", 0, start) + 1
+        lines = raw_bytes[start:].decode(encoding, errors="ignore").splitlines(True)
+        tail = [line for line in lines if line.strip()]
+        if start == 0 or len(tail) >= ANCHOR_LINES:
+            break
+        window *= 2
+
+    # 마지막 비어 있지 않은 줄까지 (그 뒤 빈 줄/줄바꿈은 다음 내보내기에서 달라질 수 있음)
+    while lines and not lines[-1].strip():
+        lines.pop()
+    kept = 0
+    for i in range(len(lines) - 1, -1, -1):
+        if lines[i].strip():
+            kept += 1
+            if kept == ANCHOR_LINES:
+                return "".join(lines[i:]).rstrip("\r\n")
+    return "".join(lines).rstrip("\r\n")
+
+
+def build_chat_state(raw_bytes: bytes) -> Dict:
+    """
+    내보내기 전체를 스트리밍으로 훑어서 병합 가능한 집계 상태를 만듦
+    """
+    features, day, n_records = _scan(iter_kakao_lines(raw_bytes), day=None)
+
+    return {
+        "version": STATE_VERSION,
+        "parser_version": PARSER_VERSION,
+        "features_version": feature_fingerprint(),
+        "features": features,
+        "anchor": read_anchor(raw_bytes),
+        "day": day,
+        "n_records": n_records,
+    }
+
+
+# -----------------------------
+# 2. 새 내보내기로 갱신
+# -----------------------------
+def find_tail_offset(state: Dict, raw_bytes: bytes) -> Optional[int]:
+    """
+    새 내보내기가 "지난번 내보내기 + 뒤에 붙은 대화" 이면 붙은 부분의 시작 바이트 위치,
+    판단할 수 없으면 None
+    """
+    anchor = state.get("anchor")
+    if not anchor or state.get("parser_version") != PARSER_VERSION:
+        return None
+    # 규칙 파일 / 감정 사전이 바뀌었으면 예전 집계와 새 집계를 섞을 수 없으므로 전체 재계산
+    if state.get("features_version") != feature_fingerprint():
+        return None
+
+    try:
+        anchor_bytes = anchor.encode(_decode_encoding(raw_bytes))
+    except UnicodeEncodeError:
+        return None
+
+    pos = raw_bytes.find(anchor_bytes)
+    # 기준점이 여러 번 나오면 어디서 이어지는지 확신할 수 없으므로 전체 재계산
+    if pos < 0 or raw_bytes.find(anchor_bytes, pos + 1) >= 0:
+        return None
+
+    # 기준점 마지막 줄이 새 파일에서 더 긴 줄의 앞부분이면 안 됨
+    end = pos + len(anchor_bytes)
+    if raw_bytes[end:end + 1] not in (b"", b"\r", b"\n"):
+        return None
+    return end
+
+
+def _first_line_continues(lines: Iterator[str]) -> Tuple[bool, Iterator[str]]:
+    """
+    붙은 부분의 첫 줄이 헤더 없는 줄(= 지난번 마지막 메시지의 이어지는 줄)인지 확인
+    """
+    buffered = []
+    continues = False
+    for line in lines:
+        buffered.append(line)
+        stripped = line.strip()
+        if stripped:
+            continues = match_line(stripped)[0] is None
+            break
+
+    def chained():
+        yield from buffered
+        yield from lines
+
+    return continues, chained()
+
+
+def update_chat_state(state: Dict, raw_bytes: bytes) -> Tuple[Dict, str]:
+    """
+    새 내보내기로 상태 갱신
+    반환: (새 상태, 방식) 방식은 "incremental"(붙은 부분만 파싱) 또는 "full"(전체 재계산)
+    """
+    offset = find_tail_offset(state, raw_bytes)
+    if offset is None:
+        return build_chat_state(raw_bytes), "full"
+
+    tail_lines = iter_kakao_lines(raw_bytes[offset:].decode(_decode_encoding(raw_bytes), errors="ignore"))
+
+    # 지난번 마지막 메시지에 줄이 더 붙는 경우는 병합할 수 없으므로 전체 재계산
+    continues, tail_lines = _first_line_continues(tail_lines)
+    if continues:
+        return build_chat_state(raw_bytes), "full"
+
+    features, day, n_records = _scan(tail_lines, day=state.get("day"), features=state["features"])
+
+    return {
+        "version": STATE_VERSION,
+        "parser_version": PARSER_VERSION,
+        "features_version": feature_fingerprint(),
+        "features": features,
+        "anchor": read_anchor(raw_bytes),
+        "day": day,
+        "n_records": state["n_records"] + n_records,
+    }, "incremental"
+
+
+# -----------------------------
+# 3. 저장 / 불러오기 / 결과 보기
+# -----------------------------
+def save_chat_state(state: Dict, path: Path) -> None:
+    data = dict(state)
+    data["features"] = features_to_dict(state["features"])
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def load_chat_state(path: Path) -> Optional[Dict]:
+    """
+    저장된 상태 불러오기 (없거나 버전이 다르면 None)
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if data.get("version") != STATE_VERSION:
+        return None
+
+    data["features"] = features_from_dict(data["features"])
+    return data
+
+
+def state_results(state: Dict) -> Dict[str, Dict]:
+    """
+    화자별 analyze_style / estimate_mbti / analyze_emotions 결과
+    """
+    results = {}
+    for name, row in state["features"].iterrows():
+        results[name] = {
+            "style": style_from_features(row),
+            "rule_mbti": mbti_from_features(row),
+            "emotions": emotions_from_features(row),
+        }
+    return results
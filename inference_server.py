@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from analysis_ml import MODEL_PATH, load_model_bundle, predict_proba_combined
+
+# 로컬 추론 서버 기본 설정
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5.0
+
+# 최근 요청 지연 시간을 몇 개까지 보관할지 (p50 / p95 계산용)
+LATENCY_WINDOW = 10_000
+
+
+# -----------------------------
+# 1. 마이크로 배치
+# -----------------------------
+class MicroBatcher:
+    """
+    동시에 들어온 요청을 모아서 한 번의 벡터화 + 예측으로 처리
+    max_batch_size 개가 모이거나 첫 요청 후 max_wait_ms 가 지나면 바로 실행
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable = predict_proba_combined,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: float = MAX_WAIT_MS,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # 모델 호출은 한 스레드에서만 (이벤트 루프는 계속 요청을 받음)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        self.n_requests = 0
+        self.n_batches = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    async def submit(self, texts: List[str]) -> Dict:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((" ".join(texts), time.perf_counter(), future))
+        return await future
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            combined = [item[0] for item in batch]
+            try:
+                classes, proba = await loop.run_in_executor(self.executor, self.predict_fn, combined)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            best = proba.argmax(axis=1)
+            for row, (_, started, future) in enumerate(batch):
+                self.latencies.append(now - started)
+                if future.done():
+                    continue
+                future.set_result({
+                    "mbti": str(classes[best[row]]),
+                    "confidence": round(float(proba[row, best[row]]), 3),
+                    "proba": {str(cls): float(p) for cls, p in zip(classes, proba[row])},
+                })
+
+            self.n_requests += len(batch)
+            self.n_batches += 1
+
+    def stats(self) -> Dict:
+        """
+        큐 길이 / 처리량 / 지연 시간 카운터
+        """
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+
+        return {
+            "queue_depth": self.queue.qsize(),
+            "requests": self.n_requests,
+            "batches": self.n_batches,
+            "avg_batch_size": round(self.n_requests / self.n_batches, 2) if self.n_batches else 0.0,
+            "latency_ms_avg": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        }
+
+
+# -----------------------------
+# 2. 서버 (한 줄에 JSON 하나)
+# -----------------------------
+# 요청: {"id": 1, "texts": ["안녕", ...]}  → 응답: {"id": 1, "mbti": ..., "confidence": ..., "proba": {...}}
+# 요청: {"op": "stats"}                    → 응답: MicroBatcher.stats()
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, batcher: MicroBatcher) -> None:
+    write_lock = asyncio.Lock()
+    pending = set()
+
+    async def respond(payload: Dict) -> None:
+        async with write_lock:
+            writer.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+
+    async def handle(request: Dict) -> None:
+        request_id = request.get("id")
+        try:
+            if request.get("op") == "stats":
+                await respond({"id": request_id, **batcher.stats()})
+                return
+            texts = request.get("texts")
+            if texts is None:
+                texts = [request.get("text", "")]
+            result = await batcher.submit([str(t) for t in texts])
+            await respond({"id": request_id, **result})
+        except Exception as e:
+            await respond({"id": request_id, "error": str(e)})
+
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                await respond({"error": f"잘못된 JSON 입니다: {e}"})
+                continue
+            # 한 연결에서 여러 요청을 연달아 보내도 같이 배치되도록 요청마다 task
+            task = asyncio.create_task(handle(request))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            # 클라이언트가 먼저 끊은 경우
+            pass
+
+
+async def start_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    unix_path: Optional[str] = None,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_wait_ms: float = MAX_WAIT_MS,
+):
+    """
+    서버 시작 (모델은 시작할 때 한 번 올려 두고 계속 사용)
+    반환: (asyncio 서버, MicroBatcher, 배치 task)
+    """
+    load_model_bundle(MODEL_PATH)
+
+    batcher = MicroBatcher(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    batch_task = asyncio.create_task(batcher.run())
+
+    def client_connected(reader, writer):
+        return handle_client(reader, writer, batcher)
+
+    if unix_path:
+        server = await asyncio.start_unix_server(client_connected, path=unix_path)
+    else:
+        server = await asyncio.start_server(client_connected, host=host, port=port)
+    return server, batcher, batch_task
+
+
+async def serve(**kwargs) -> None:
+    server, _, batch_task = await start_server(**kwargs)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"✅ MBTI 추론 서버 실행 중: {addresses}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MBTI 모델 로컬 추론 서버 (마이크로 배치)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", dest="unix_path", default=None, help="TCP 대신 사용할 유닉스 소켓 경로")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            host=args.host,
+            port=args.port,
+            unix_path=args.unix_path,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
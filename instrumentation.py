@@ -0,0 +1,148 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 현재 실행 흐름에서 기록 중인 Tracer (없으면 span 은 아무것도 하지 않음)
+_CURRENT: ContextVar[Optional["Tracer"]] = ContextVar("instrumentation_tracer", default=None)
+
+
+# -----------------------------
+# 1. 구간(span) 기록
+# -----------------------------
+class _NoopSpan:
+    """
+    기록이 꺼져 있을 때 쓰는 빈 span (with 문 / set 호출만 받아 줌)
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    단계 하나의 시간 / 행 수 / 메모리 증가량
+    - memory=True 인 Tracer 에서는 tracemalloc 으로 구간 안 할당 최대치 - 시작 시점 사용량 기록
+    """
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.record = {"name": name, "id": len(tracer.spans), "parent": None, **attrs}
+        self.peak_seen = 0
+
+    def set(self, **attrs) -> None:
+        # rows=..., speaker=... 처럼 실행 중에 알게 된 값 추가
+        self.record.update(attrs)
+
+    def __enter__(self):
+        tracer = self.tracer
+        if tracer.stack:
+            self.record["parent"] = tracer.stack[-1].record["id"]
+        tracer.spans.append(self.record)
+        tracer.stack.append(self)
+
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if tracer.stack[:-1]:
+                parent = tracer.stack[-2]
+                parent.peak_seen = max(parent.peak_seen, peak)
+            self.mem_start = current
+            tracemalloc.reset_peak()
+
+        self.started = time.perf_counter()
+        self.record["start_ms"] = round((self.started - tracer.started) * 1000, 3)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        tracer = self.tracer
+        self.record["duration_ms"] = round((time.perf_counter() - self.started) * 1000, 3)
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+
+        if tracer.memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self.peak_seen)
+            self.record["peak_memory_kb"] = round((peak - self.mem_start) / 1024, 1)
+            if len(tracer.stack) > 1:
+                parent = tracer.stack[-2]
+                parent.peak_seen = max(parent.peak_seen, peak)
+
+        tracer.stack.pop()
+        return False
+
+
+class Tracer:
+    """
+    tracing() 안에서 열린 span 을 순서대로 모아 두는 기록기
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.spans: List[Dict] = []
+        self.stack: List[Span] = []
+        self.started = time.perf_counter()
+
+    def to_dict(self) -> Dict:
+        return {"memory": self.memory, "spans": self.spans}
+
+    def summary(self) -> List[Dict]:
+        """
+        이름별 합계 (호출 수 / 총 시간 / 최대 메모리 증가량 / 행 수 합), 총 시간 내림차순
+        """
+        totals: Dict[str, Dict] = {}
+        for record in self.spans:
+            item = totals.setdefault(record["name"], {"name": record["name"], "count": 0, "total_ms": 0.0, "rows": 0})
+            item["count"] += 1
+            item["total_ms"] = round(item["total_ms"] + record.get("duration_ms", 0.0), 3)
+            item["rows"] += int(record.get("rows", 0) or 0)
+            if "peak_memory_kb" in record:
+                item["peak_memory_kb"] = max(item.get("peak_memory_kb", 0.0), record["peak_memory_kb"])
+        return sorted(totals.values(), key=lambda item: item["total_ms"], reverse=True)
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def span(name: str, **attrs):
+    """
+    with span("parse", rows=len(df)): ...
+    tracing() 밖이면 공용 빈 span 을 돌려줘서 비용은 ContextVar 조회 한 번
+    """
+    tracer = _CURRENT.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, attrs)
+
+
+@contextmanager
+def tracing(enabled: bool = True, memory: bool = False):
+    """
+    with tracing(memory=True) as tracer: ... → tracer.spans 에 이 블록 안의 span 이 모임
+    enabled=False 면 None 을 돌려주고 아무것도 기록하지 않음
+    """
+    if not enabled:
+        yield None
+        return
+
+    tracer = Tracer(memory=memory)
+    started_tracemalloc = memory and not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    token = _CURRENT.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _CURRENT.reset(token)
+        if started_tracemalloc:
+            tracemalloc.stop()
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from inference_server import MAX_BATCH_SIZE, MAX_WAIT_MS, start_server
+
+DATA_PATH = "data/kakao_mbti_dataset.csv"
+
+
+# -----------------------------
+# 부하 생성기
+# -----------------------------
+def make_payloads(n: int, texts_per_request: int, seed: int = 42) -> List[List[str]]:
+    """
+    학습 데이터 문장을 섞어서 요청 n 개 분량의 문장 목록 생성
+    """
+    sentences = pd.read_csv(DATA_PATH)["text"].astype(str).tolist()
+    rng = random.Random(seed)
+    return [rng.sample(sentences, texts_per_request) for _ in range(n)]
+
+
+async def run_client(connect, payloads: List[List[str]], latencies: List[float]) -> None:
+    """
+    연결 하나에서 요청을 하나씩 보내고 응답을 기다림 (동시성은 연결 수로 조절)
+    """
+    reader, writer = await connect()
+    try:
+        for i, texts in enumerate(payloads):
+            started = time.perf_counter()
+            writer.write((json.dumps({"id": i, "texts": texts}, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            if "error" in response:
+                raise RuntimeError(response["error"])
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def fetch_stats(connect) -> Dict:
+    reader, writer = await connect()
+    try:
+        writer.write(b'{"op": "stats"}\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(connect, payloads: List[List[str]], concurrency: int) -> Dict:
+    """
+    concurrency 개 연결로 payloads 를 나눠 보내고 처리량 / 지연 시간 측정
+    """
+    latencies: List[float] = []
+    shares = [payloads[i::concurrency] for i in range(concurrency)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(connect, share, latencies) for share in shares if share))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    server_stats = await fetch_stats(connect)
+    return {
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": round(latencies[len(latencies) // 2] * 1000, 2),
+        "latency_ms_p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+        "avg_batch_size": server_stats.get("avg_batch_size"),
+    }
+
+
+async def run_local(payloads: List[List[str]], concurrency: int, max_batch_size: int, max_wait_ms: float) -> Dict:
+    """
+    같은 프로세스에 임시 유닉스 소켓 서버를 띄워서 측정
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "mbti.sock")
+        server, _, batch_task = await start_server(
+            unix_path=path, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+        )
+        try:
+            return await run_load(lambda: asyncio.open_unix_connection(path), payloads, concurrency)
+        finally:
+            # 서버 쪽 연결 핸들러가 EOF 를 받고 끝날 시간을 줌
+            await asyncio.sleep(0.05)
+            server.close()
+            await server.wait_closed()
+            batch_task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="추론 서버 부하 테스트 (요청당 추론 vs 마이크로 배치)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--texts-per-request", type=int, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--host", default=None, help="이미 떠 있는 서버에 보낼 때 (지정하지 않으면 두 설정을 직접 띄워 비교)")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--unix", dest="unix_path", default=None)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.requests, args.texts_per_request)
+
+    if args.host or args.unix_path:
+        if args.unix_path:
+            connect = lambda: asyncio.open_unix_connection(args.unix_path)  # noqa: E731
+        else:
+            connect = lambda: asyncio.open_connection(args.host, args.port)  # noqa: E731
+        print(json.dumps(asyncio.run(run_load(connect, payloads, args.concurrency)), ensure_ascii=False, indent=2))
+        return
+
+    single = asyncio.run(run_local(payloads, args.concurrency, max_batch_size=1, max_wait_ms=0))
+    batched = asyncio.run(run_local(payloads, args.concurrency, args.max_batch_size, args.max_wait_ms))
+
+    print(f"{'':>16} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'batch':>8}")
+    for name, result in [("per-request", single), ("micro-batch", batched)]:
+        print(
+            f"{name:>16} {result['throughput_rps']:>10} {result['latency_ms_p50']:>10} "
+            f"{result['latency_ms_p95']:>10} {result['avg_batch_size']:>8}"
+        )
+    print(f"처리량 향상: x{batched['throughput_rps'] / single['throughput_rps']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+# -----------------------------
+# Aho-Corasick 다중 키워드 매칭
+# -----------------------------
+class AhoCorasick:
+    """
+    여러 키워드를 한 번에 찾는 자동자 (Aho-Corasick)
+    한 번 만들어 두면 키워드가 수천 개여도 문장을 한 번만 훑음
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+
+        # goto[node]: 글자 → 다음 노드, fail[node]: 실패 링크, out[node]: 이 노드에서 끝나는 패턴 id
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[int, ...]] = [()]
+
+        own: List[List[int]] = [[]]
+        for pid, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    own.append([])
+                node = nxt
+            own[node].append(pid)
+
+        self.out = [tuple(ids) for ids in own]
+
+        # BFS 로 실패 링크 계산, 출력은 실패 링크 쪽 출력까지 합쳐 둠
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        (끝 위치, 패턴 id) 를 등장 순서대로 반환 (겹치는 매칭 포함)
+        """
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                yield pos, pid
+
+    def count(self, text: str) -> Dict[int, int]:
+        """
+        패턴 id → 등장 횟수 (등장한 패턴만)
+        """
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        counts: Dict[int, int] = {}
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                counts[pid] = counts.get(pid, 0) + 1
+        return counts
@@ -0,0 +1,113 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# scikit-learn / joblib 없이 추론하기 위한 모델 배열 (train_mbti_model.py --export-numpy 로 생성)
+NUMPY_MODEL_PATH = Path("models/mbti_model_numpy.npz")
+
+
+# -----------------------------
+# NumPy 전용 추론
+# -----------------------------
+class NumpyModel:
+    """
+    TfidfVectorizer + LogisticRegression 을 NumPy 배열만으로 재현
+    - 토큰화: lowercase → token_pattern findall → n-gram (공백으로 연결)
+    - 특징: 어휘 사전 횟수 × idf → l2 정규화
+    - 출력: softmax (이진 분류면 sigmoid)
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.classes_ = arrays["classes"]
+        self.vocabulary = {str(term): idx for idx, term in enumerate(arrays["terms"])}
+        self.idf = arrays["idf"]
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+
+        self.token_pattern = re.compile(str(arrays["token_pattern"]))
+        self.lowercase = bool(arrays["lowercase"])
+        self.ngram_range = tuple(int(n) for n in arrays["ngram_range"])
+        self.sublinear_tf = bool(arrays["sublinear_tf"])
+        self.norm = str(arrays["norm"])
+
+    @classmethod
+    def load(cls, path: Path = NUMPY_MODEL_PATH) -> "NumpyModel":
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def analyze(self, text: str) -> List[str]:
+        """
+        TfidfVectorizer(analyzer="word") 와 같은 토큰 / n-gram 목록
+        """
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+
+        min_n, max_n = self.ngram_range
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    def transform_one(self, text: str):
+        """
+        문장 하나의 (어휘 id 배열, tf-idf 값 배열)
+        """
+        counts = {}
+        for term in self.analyze(text):
+            idx = self.vocabulary.get(term)
+            if idx is not None:
+                counts[idx] = counts.get(idx, 0) + 1
+
+        ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf[ids]
+
+        if self.norm == "l2":
+            scale = np.sqrt(np.dot(values, values))
+        elif self.norm == "l1":
+            scale = np.abs(values).sum()
+        else:
+            scale = 0.0
+        if scale > 0:
+            values /= scale
+        return ids, values
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        logits = np.empty((len(texts), len(self.intercept)), dtype=np.float64)
+        for row, text in enumerate(texts):
+            ids, values = self.transform_one(str(text))
+            logits[row] = self.coef[:, ids] @ values + self.intercept
+
+        if logits.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-logits[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+
+@lru_cache(maxsize=None)
+def load_numpy_model(path: Path = NUMPY_MODEL_PATH) -> NumpyModel:
+    return NumpyModel.load(path)
+
+
+def predict_mbti_numpy(texts: List[str], path: Path = NUMPY_MODEL_PATH) -> Dict:
+    """
+    predict_mbti_ml 과 같은 형태의 결과를 NumPy 전용 모델로 계산
+    """
+    model = load_numpy_model(path)
+    proba = model.predict_proba([" ".join(texts)])[0]
+    best = int(proba.argmax())
+
+    return {
+        "mbti": str(model.classes_[best]),
+        "confidence": round(float(proba[best]), 3),
+    }
@@ -0,0 +1,80 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# 화자별 행 위치 인덱스
+# -----------------------------
+class SpeakerPartition:
+    """
+    파싱된 대화에서 화자 → 행 위치 배열을 한 번에 만들어 두는 인덱스
+    - codes: 행별 화자 번호 (speaker 가 비어 있으면 -1)
+    - speakers: 화자 번호 → 이름 (정렬)
+    - order: 화자 번호 순으로 stable argsort 한 행 위치 (화자 안에서는 원래 순서 유지)
+    - offsets: order[offsets[c]:offsets[c + 1]] 이 화자 c 의 행
+    화자별 DataFrame 을 복사하지 않고, 필요한 열만 한 번 정렬해서 화자별 슬라이스(view)로 나눠 씀
+    """
+
+    def __init__(self, codes: np.ndarray, speakers: List[str]):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.speakers = list(speakers)
+
+        sizes = np.bincount(self.codes[self.codes >= 0], minlength=len(self.speakers))
+        self.offsets = np.r_[0, np.cumsum(sizes)]
+        # 화자가 없는 행(-1)은 뒤로 빼고 잘라냄
+        # 정렬 키는 화자 수에 맞는 가장 작은 정수형으로 (16비트 이하면 numpy 가 radix sort 사용)
+        key = np.where(self.codes >= 0, self.codes, len(self.speakers))
+        order = np.argsort(key.astype(np.min_scalar_type(len(self.speakers))), kind="stable")
+        self.order = order[: self.offsets[-1]]
+        self._position = {name: code for code, name in enumerate(self.speakers)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = "speaker") -> "SpeakerPartition":
+        speaker = df[column]
+        if isinstance(speaker.dtype, pd.CategoricalDtype):
+            # 파서 결과는 정렬된 category → 코드를 그대로 사용 (메시지가 없는 category 는 아래에서 제외)
+            codes = speaker.cat.codes.to_numpy()
+            speakers = list(speaker.cat.categories)
+            if not speaker.cat.categories.is_monotonic_increasing:
+                codes, speakers = pd.factorize(speaker, sort=True)
+        else:
+            codes, speakers = pd.factorize(speaker, sort=True)
+        partition = cls(codes, [str(name) for name in speakers])
+        return partition.drop_empty()
+
+    def drop_empty(self) -> "SpeakerPartition":
+        """
+        메시지가 없는 화자를 빼고 번호를 다시 매김 (순서 유지)
+        """
+        sizes = np.diff(self.offsets)
+        if (sizes > 0).all():
+            return self
+        keep = np.flatnonzero(sizes > 0)
+        remap = np.full(len(self.speakers) + 1, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        return SpeakerPartition(remap[self.codes], [self.speakers[c] for c in keep])
+
+    def __len__(self) -> int:
+        return len(self.speakers)
+
+    def positions(self, name: str) -> np.ndarray:
+        """
+        화자 한 명의 행 위치 (order 의 view)
+        """
+        code = self._position[name]
+        return self.order[self.offsets[code]: self.offsets[code + 1]]
+
+    def sizes(self) -> pd.Series:
+        return pd.Series(np.diff(self.offsets), index=self.speakers, name="n_messages")
+
+    def groups(self, values) -> Dict[str, np.ndarray]:
+        """
+        열 값(values)을 화자 순으로 한 번 정렬한 뒤 화자별 슬라이스(view) dict
+        """
+        grouped = np.asarray(values)[self.order]
+        return {
+            name: grouped[self.offsets[code]: self.offsets[code + 1]]
+            for code, name in enumerate(self.speakers)
+        }
@@ -0,0 +1,121 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable
+
+from multipattern import AhoCorasick
+
+# 규칙 파일 경로 (축별 판정 방식 + 글자별 가중치 키워드)
+RULES_PATH = Path("data/mbti_rules.json")
+
+MBTI_LETTERS = ["E", "I", "N", "S", "T", "F", "J", "P"]
+
+
+# -----------------------------
+# 규칙 기반 MBTI 엔진
+# -----------------------------
+class MbtiRuleEngine:
+    """
+    규칙 파일을 읽어 모든 키워드를 하나의 Aho-Corasick 자동자로 묶은 규칙 엔진
+
+    axes: 축마다 [앞 글자, 뒤 글자] (점수가 같으면 앞 글자)
+      - avg_length : 평균 문장 길이가 threshold 보다 길면 앞 글자 +1, 아니면 뒤 글자 +1
+      - keywords   : presence → 키워드가 한 번이라도 나온 글자 +1
+                     weighted → 글자마다 (등장 횟수 × 가중치) 합만큼
+                     둘 다 없으면 default 글자 +1
+    rules: {"letter", "keyword", "weight"}
+    """
+
+    def __init__(self, config: Dict):
+        self.axes = config["axes"]
+        rules = config.get("rules", [])
+
+        for rule in rules:
+            if rule["letter"] not in MBTI_LETTERS:
+                raise ValueError(f"알 수 없는 MBTI 글자입니다: {rule['letter']}")
+
+        self.rule_letters = [rule["letter"] for rule in rules]
+        self.rule_weights = [float(rule.get("weight", 1)) for rule in rules]
+        self.matcher = AhoCorasick([rule["keyword"] for rule in rules])
+        # 규칙 내용 해시 (규칙으로 계산한 집계를 저장해 둘 때 같은 규칙인지 확인용)
+        self.digest = hashlib.sha256(
+            json.dumps(config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def from_file(cls, path: Path = RULES_PATH) -> "MbtiRuleEngine":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def letter_hits(self, message: str) -> Dict[str, float]:
+        """
+        메시지 하나에서 글자별 (등장 횟수 × 가중치) 합 (나온 글자만)
+        """
+        hits: Dict[str, float] = {}
+        for pid, n in self.matcher.count(message).items():
+            letter = self.rule_letters[pid]
+            hits[letter] = hits.get(letter, 0.0) + n * self.rule_weights[pid]
+        return hits
+
+    def score(self, n_messages: int, n_chars: int, letter_weights: Dict[str, float]) -> Dict:
+        """
+        메시지 수 / 글자 수 / 글자별 키워드 가중치 합으로 MBTI 판정 (estimate_mbti 결과 형태)
+        """
+        score = {letter: 0 for letter in MBTI_LETTERS}
+        mbti = ""
+
+        for axis in self.axes:
+            first, second = axis["letters"]
+
+            if axis["type"] == "avg_length":
+                # " ".join(messages) 길이 = 글자 수 + 공백 (메시지 수 - 1)
+                text_length = n_chars + max(n_messages - 1, 0)
+                if text_length / max(n_messages, 1) > axis["threshold"]:
+                    score[first] += 1
+                else:
+                    score[second] += 1
+
+            elif axis["type"] == "keywords":
+                first_hits = letter_weights.get(first, 0)
+                second_hits = letter_weights.get(second, 0)
+                if first_hits <= 0 and second_hits <= 0:
+                    score[axis["default"]] += 1
+                elif axis.get("scoring", "presence") == "weighted":
+                    score[first] += first_hits
+                    score[second] += second_hits
+                else:
+                    score[first] += 1 if first_hits > 0 else 0
+                    score[second] += 1 if second_hits > 0 else 0
+
+            else:
+                raise ValueError(f"알 수 없는 규칙 축 형식입니다: {axis['type']}")
+
+            mbti += first if score[first] >= score[second] else second
+
+        return {
+            "mbti": mbti,
+            "detail_score": score
+        }
+
+    def score_messages(self, messages: Iterable[str]) -> Dict:
+        """
+        메시지 목록을 합치지 않고 하나씩 훑어서 판정
+        """
+        n_messages = 0
+        n_chars = 0
+        totals: Dict[str, float] = {}
+        for msg in messages:
+            n_messages += 1
+            n_chars += len(msg)
+            for letter, w in self.letter_hits(msg).items():
+                totals[letter] = totals.get(letter, 0.0) + w
+        return self.score(n_messages, n_chars, totals)
+
+
+@lru_cache(maxsize=None)
+def load_rule_engine(path: Path = RULES_PATH) -> MbtiRuleEngine:
+    """
+    경로별로 한 번만 읽어서 재사용
+    """
+    return MbtiRuleEngine.from_file(path)
@@ -0,0 +1,205 @@
+import math
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from emotion_analysis import (
+    _EMOTIONS,
+    emotion_term_matrix,
+    label_emotions,
+    summarize_emotions,
+    term_emotion_matrix,
+)
+from features import EMOJI_PATTERN
+from instrumentation import span
+from partition import SpeakerPartition
+from rule_engine import MBTI_LETTERS, load_rule_engine
+
+# 근사 분석 기본 설정
+Z_95 = 1.96
+# 비율 지표의 95% 신뢰구간 반폭 목표 (0.02 → ±2%p)
+DEFAULT_ERROR_TARGET = 0.02
+# 메시지가 이 수 이하인 화자는 표본 없이 전부 계산 (정확한 값)
+EXACT_BELOW = 2000
+
+
+# -----------------------------
+# 1. 화자별 층화 표본
+# -----------------------------
+def required_sample_size(population: int, error_target: float, z: float = Z_95) -> int:
+    """
+    비율 지표의 신뢰구간 반폭이 error_target 이하가 되는 표본 수 (최악의 경우 p=0.5, 유한 모집단 보정)
+    """
+    if population <= 0:
+        return 0
+    n0 = z * z * 0.25 / (error_target * error_target)
+    return int(min(population, math.ceil(n0 / (1 + (n0 - 1) / population))))
+
+
+def stratified_sample(
+    partition: SpeakerPartition,
+    sample_size: Optional[int] = None,
+    error_target: float = DEFAULT_ERROR_TARGET,
+    exact_below: int = EXACT_BELOW,
+    seed: int = 0,
+) -> Dict:
+    """
+    화자마다 따로 비복원 추출 (화자별 층화 표본)
+    - sample_size 를 주면 화자당 그 수만큼, 아니면 error_target 을 만족하는 수만큼
+    - 메시지가 exact_below 이하이거나 필요한 표본 수보다 적은 화자는 전부 사용
+    반환: {"speakers", "populations", "sizes", "positions": 화자별 행 위치 (시간순)}
+    """
+    rng = np.random.default_rng(seed)
+    populations = np.diff(partition.offsets)
+    sizes = np.empty_like(populations)
+    positions = {}
+
+    for code, name in enumerate(partition.speakers):
+        rows = partition.positions(name)
+        population = int(populations[code])
+        if population <= exact_below:
+            n = population
+        elif sample_size is not None:
+            n = min(int(sample_size), population)
+        else:
+            n = required_sample_size(population, error_target)
+
+        if n < population:
+            rows = rows[np.sort(rng.choice(population, n, replace=False))]
+        sizes[code] = n
+        positions[name] = rows
+
+    return {
+        "speakers": list(partition.speakers),
+        "populations": populations,
+        "sizes": sizes,
+        "positions": positions,
+    }
+
+
+# -----------------------------
+# 2. 표본으로 추정 + 신뢰구간
+# -----------------------------
+def _interval(s1: np.ndarray, s2: np.ndarray, n: np.ndarray, population: np.ndarray, z: float) -> tuple:
+    """
+    화자별 합 / 제곱합으로 평균과 신뢰구간 반폭 (유한 모집단 보정, 전수면 0)
+    """
+    n_safe = np.maximum(n, 1)
+    mean = s1 / n_safe
+    var = np.where(n > 1, (s2 - n * mean * mean) / np.maximum(n - 1, 1), 0.0)
+    fpc = np.where(population > 1, (population - n) / np.maximum(population - 1, 1), 0.0)
+    half = z * np.sqrt(np.maximum(var, 0.0) / n_safe * fpc)
+    return mean, half
+
+
+def _estimate(value: float, half: float, digits: int) -> Dict:
+    # digits=0 이면 개수 지표 → 정수
+    cast = int if digits == 0 else float
+    return {
+        "value": cast(round(float(value), digits)),
+        "ci": [cast(round(float(value - half), digits)), cast(round(float(value + half), digits))],
+    }
+
+
+def approximate_speaker_analysis(df: pd.DataFrame, sample: Dict, z: float = Z_95) -> Dict[str, Dict]:
+    """
+    표본 메시지만으로 화자별 말투 스타일 / 감정 분포 / 규칙 MBTI 를 추정하고 신뢰구간을 붙임
+    전수 화자(exact=True)는 style_from_features / emotions_from_features / mbti_from_features 와 같은 값
+
+    반환: {화자: {"n_messages", "n_sampled", "exact",
+                  "style": {지표: {"value", "ci"}},
+                  "emotions": summarize_emotions 결과 + "ci": {감정: [하한, 상한]},
+                  "mbti_rule": {"mbti", "detail_score", "letter_rates": {글자: {"value", "ci"}}}}}
+    """
+    speakers = sample["speakers"]
+    n_speakers = len(speakers)
+    populations = sample["populations"].astype(np.float64)
+    sizes = sample["sizes"].astype(np.float64)
+
+    rows = np.concatenate([sample["positions"][name] for name in speakers]) if speakers else np.empty(0, np.int64)
+    codes = np.repeat(np.arange(n_speakers), sample["sizes"])
+
+    with span("approx_sample", rows=len(rows), speakers=n_speakers):
+        messages = df["message"].iloc[rows].astype(str).reset_index(drop=True)
+        texts = messages.tolist()
+
+        # 메시지별 값 (표본만)
+        lengths = messages.str.len().to_numpy(dtype=np.float64)
+        emojis = messages.str.count(EMOJI_PATTERN.pattern).to_numpy(dtype=np.float64)
+        questions = messages.str.contains("?", regex=False).to_numpy(dtype=np.float64)
+        exclaims = messages.str.contains("!", regex=False).to_numpy(dtype=np.float64)
+        labels = label_emotions((emotion_term_matrix(texts) @ term_emotion_matrix()).toarray())
+
+        engine = load_rule_engine()
+        letter_weights = np.zeros((len(texts), len(MBTI_LETTERS)))
+        for i, msg in enumerate(texts):
+            for letter, w in engine.letter_hits(msg).items():
+                letter_weights[i, MBTI_LETTERS.index(letter)] = w
+
+    def by_speaker(values: np.ndarray) -> tuple:
+        s1 = np.bincount(codes, weights=values, minlength=n_speakers)
+        s2 = np.bincount(codes, weights=values * values, minlength=n_speakers)
+        return _interval(s1, s2, sizes, populations, z)
+
+    length_mean, length_half = by_speaker(lengths)
+    emoji_mean, emoji_half = by_speaker(emojis)
+    question_mean, question_half = by_speaker(questions)
+    exclaim_mean, exclaim_half = by_speaker(exclaims)
+    letters = [by_speaker(letter_weights[:, j]) for j in range(len(MBTI_LETTERS))]
+
+    n_emotions = len(_EMOTIONS)
+    label_counts = np.bincount(codes * n_emotions + labels, minlength=n_speakers * n_emotions).reshape(n_speakers, n_emotions)
+    # (화자, 감정) 별 표본에서 처음 나온 문장
+    keys, first = np.unique(codes * n_emotions + labels, return_index=True)
+
+    results = {}
+    for code, name in enumerate(speakers):
+        population = int(populations[code])
+        n = int(sizes[code])
+        if population == 0:
+            continue
+
+        style = {
+            "평균 문장 길이": _estimate(length_mean[code], length_half[code], 2),
+            "이모티콘/감정표현 수": _estimate(emoji_mean[code] * population, emoji_half[code] * population, 0),
+            "질문 비율": _estimate(question_mean[code], question_half[code], 3),
+            "감탄 비율": _estimate(exclaim_mean[code], exclaim_half[code], 3),
+        }
+
+        # 감정: 표본 비율 → 전체 문장 수 추정 (처음 나온 순서대로)
+        own = keys // n_emotions == code
+        order = np.argsort(first[own], kind="stable")
+        present = (keys[own] % n_emotions)[order]
+        examples = {_EMOTIONS[e]: texts[i] for e, i in zip(present, first[own][order])}
+        p = label_counts[code] / max(n, 1)
+        fpc = (population - n) / max(population - 1, 1)
+        half = z * np.sqrt(p * (1 - p) / max(n - 1, 1) * fpc) if n > 1 else np.zeros_like(p)
+        emotions = summarize_emotions(
+            {_EMOTIONS[e]: int(round(p[e] * population)) for e in present}, examples
+        )
+        if emotions:
+            emotions["ci"] = {
+                _EMOTIONS[e]: [round(float(max(p[e] - half[e], 0.0)), 3), round(float(min(p[e] + half[e], 1.0)), 3)]
+                for e in present
+            }
+
+        # 규칙 MBTI: 표본의 메시지당 글자 가중치 / 길이로 전체 합을 추정해서 판정
+        rule = engine.score(
+            population,
+            int(round(length_mean[code] * population)),
+            {letter: letters[j][0][code] * population for j, letter in enumerate(MBTI_LETTERS)},
+        )
+        rule["letter_rates"] = {
+            letter: _estimate(letters[j][0][code], letters[j][1][code], 4) for j, letter in enumerate(MBTI_LETTERS)
+        }
+
+        results[name] = {
+            "n_messages": population,
+            "n_sampled": n,
+            "exact": n == population,
+            "style": style,
+            "emotions": emotions,
+            "mbti_rule": rule,
+        }
+    return results
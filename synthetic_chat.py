@@ -0,0 +1,153 @@
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from emotion_analysis import EMOTION_LEXICON
+from rule_engine import RULES_PATH
+
+# 합성 대화 기본 설정
+CHAT_FORMATS = ["export", "bracket"]
+WEEKDAYS = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
+START_TIME = datetime(2023, 1, 1, 9, 0)
+
+FILLER_WORDS = [
+    "오늘", "내일", "그거", "진짜", "아니", "근데", "혹시", "지금", "나중에", "같이",
+    "밥", "회사", "학교", "집", "주말", "영화", "카페", "숙제", "운동", "여행",
+    "먹을래", "갈까", "했어", "봤어", "할게", "몰라", "괜찮아", "알겠어", "그래", "응",
+]
+EMOJIS = ["😀", "😂", "🥲", "😡", "😱", "❤️", "👍", "🙏", "🎉", "💕"]
+ENDINGS = ["", "", "", "?", "!", "~", "..", "ㅋㅋ"]
+
+
+def _load_keywords() -> list:
+    # 감정 사전 + MBTI 규칙 키워드 (분석 단계가 실제로 일을 하도록 섞어 넣을 단어)
+    keywords = [term for terms in EMOTION_LEXICON.values() for term in terms]
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        keywords += [rule["keyword"] for rule in json.load(f).get("rules", [])]
+    return keywords
+
+
+# -----------------------------
+# 1. 줄 생성
+# -----------------------------
+def _format_clock(moment: datetime) -> str:
+    # 오전/오후 h:mm (카카오톡 표기)
+    half = "오전" if moment.hour < 12 else "오후"
+    hour = moment.hour % 12 or 12
+    return f"{half} {hour}:{moment.minute:02d}"
+
+
+def _date_line(moment: datetime) -> str:
+    return f"--------------- {moment.year}년 {moment.month}월 {moment.day}일 {WEEKDAYS[moment.weekday()]} ---------------"
+
+
+def generate_chat_lines(
+    n_lines: int,
+    n_speakers: int = 5,
+    fmt: str = "export",
+    multiline_ratio: float = 0.05,
+    emoji_ratio: float = 0.1,
+    lexicon_ratio: float = 0.2,
+    seed: int = 0,
+) -> Iterator[str]:
+    """
+    parse_kakao_chat 이 읽을 수 있는 합성 카카오톡 대화를 한 줄씩 생성 (헤더 포함 n_lines 줄)
+    - fmt: "export" (PC 내보내기 "2023. 5. 12. 오후 3:22, 이름 : 메시지") / "bracket" (복붙형 "[이름] [오후 3:22] 메시지")
+    - multiline_ratio: 메시지가 여러 줄로 이어질 확률
+    - emoji_ratio / lexicon_ratio: 단어마다 이모지 / 감정·MBTI 키워드가 들어갈 확률
+    """
+    if fmt not in CHAT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능: {CHAT_FORMATS})")
+
+    rng = random.Random(seed)
+    speakers = [f"사용자{i + 1}" for i in range(n_speakers)]
+    keywords = _load_keywords()
+    moment = START_TIME
+
+    header = [f"{speakers[0]} 님과 카카오톡 대화", f"저장한 날짜 : {moment:%Y-%m-%d %H:%M:%S}", ""]
+    for line in header[:n_lines]:
+        yield line
+    written = len(header)
+    if written >= n_lines:
+        return
+    yield _date_line(moment)
+    written += 1
+
+    while written < n_lines:
+        # 메시지 간격: 대부분 몇 분, 가끔 몇 시간
+        step = rng.expovariate(1 / 3) if rng.random() < 0.95 else rng.uniform(60, 600)
+        previous = moment
+        moment += timedelta(minutes=step)
+        if moment.date() != previous.date():
+            yield _date_line(moment)
+            written += 1
+            continue
+
+        words = []
+        for _ in range(rng.randint(1, 8)):
+            r = rng.random()
+            if r < lexicon_ratio:
+                words.append(rng.choice(keywords))
+            elif r < lexicon_ratio + emoji_ratio:
+                words.append(rng.choice(EMOJIS))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+        message = " ".join(words) + rng.choice(ENDINGS)
+
+        speaker = rng.choice(speakers)
+        if fmt == "export":
+            stamp = f"{moment.year}. {moment.month}. {moment.day}. {_format_clock(moment)}"
+            yield f"{stamp}, {speaker} : {message}"
+        else:
+            yield f"[{speaker}] [{_format_clock(moment)}] {message}"
+        written += 1
+
+        while written < n_lines and rng.random() < multiline_ratio:
+            yield " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(1, 5)))
+            written += 1
+
+
+def write_synthetic_chat(path: Path, n_lines: int, newline: str = "\n", **kwargs) -> Path:
+    """
+    합성 대화를 UTF-8 txt 파일로 저장 (kwargs 는 generate_chat_lines 설정)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
+        for line in generate_chat_lines(n_lines, **kwargs):
+            f.write(line + newline)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 카카오톡 대화 생성")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--speakers", type=int, default=5)
+    parser.add_argument("--format", dest="fmt", choices=CHAT_FORMATS, default="export")
+    parser.add_argument("--multiline", type=float, default=0.05, help="여러 줄 메시지 비율")
+    parser.add_argument("--emoji", type=float, default=0.1, help="이모지 밀도 (단어당 확률)")
+    parser.add_argument("--lexicon", type=float, default=0.2, help="감정/MBTI 키워드 밀도 (단어당 확률)")
+    parser.add_argument("--crlf", action="store_true", help="줄바꿈을 CRLF 로 저장")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_synthetic_chat(
+        args.output,
+        args.lines,
+        newline="\r\n" if args.crlf else "\n",
+        n_speakers=args.speakers,
+        fmt=args.fmt,
+        multiline_ratio=args.multiline,
+        emoji_ratio=args.emoji,
+        lexicon_ratio=args.lexicon,
+        seed=args.seed,
+    )
+    print(f"✅ 합성 대화 생성 완료: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
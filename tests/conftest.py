@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 모듈은 저장소 루트에 평평하게 있고, 규칙 / 모델 경로도 루트 기준 상대 경로
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _repo_root_cwd(monkeypatch):
+    monkeypatch.chdir(ROOT)
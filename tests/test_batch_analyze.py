@@ -0,0 +1,56 @@
+import json
+import os
+
+import batch_analyze
+from batch_analyze import run_batch
+from synthetic_chat import generate_chat_lines
+
+
+def _crash_on_marked_file(path, use_ml=True, trace=False):
+    # 메모리 부족 등으로 워커가 바로 죽는 상황 흉내
+    if path.name.startswith("crash"):
+        os._exit(1)
+    return batch_analyze._analyze_file(path, use_ml)
+
+
+def _write_chats(directory, names):
+    paths = []
+    for i, name in enumerate(names):
+        path = directory / name
+        lines = generate_chat_lines(200, n_speakers=3, fmt="export", seed=i)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _statuses(output):
+    with open(output, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    return {r["file"]: r["status"] for r in records if "status" in r}
+
+
+def test_worker_crash_only_fails_its_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_analyze, "analyze_file", _crash_on_marked_file)
+    # 다른 파일들과 같이 실행 중일 때 죽도록 중간에
+    names = ["chat0.txt", "chat1.txt", "crash.txt", "chat2.txt", "chat3.txt", "chat4.txt", "chat5.txt"]
+    files = _write_chats(tmp_path, names)
+    output = tmp_path / "out.jsonl"
+
+    summary = run_batch(files, output=output, workers=2, max_pending=4, use_ml=False)
+
+    statuses = _statuses(output)
+    assert summary["done"] == 6
+    assert summary["errors"] == 1
+    assert statuses == {str(p): ("error" if p.name == "crash.txt" else "done") for p in files}
+
+
+def test_worker_crash_serial_pool(tmp_path, monkeypatch):
+    # 동시에 하나씩만 실행해도 나머지 파일은 끝까지 진행
+    monkeypatch.setattr(batch_analyze, "analyze_file", _crash_on_marked_file)
+    files = _write_chats(tmp_path, ["crash_a.txt", "chat0.txt", "crash_b.txt", "chat1.txt"])
+    output = tmp_path / "out.jsonl"
+
+    summary = run_batch(files, output=output, workers=1, max_pending=1, use_ml=False)
+
+    assert (summary["done"], summary["errors"]) == (2, 2)
+    assert _statuses(output) == {str(p): ("error" if p.name.startswith("crash") else "done") for p in files}
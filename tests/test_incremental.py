@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+
+import incremental
+from incremental import (
+    build_chat_state,
+    load_chat_state,
+    save_chat_state,
+    state_results,
+    update_chat_state,
+)
+from synthetic_chat import CHAT_FORMATS, generate_chat_lines
+
+
+def _lines(fmt: str, n_lines: int = 4000) -> list:
+    return list(generate_chat_lines(n_lines, n_speakers=5, fmt=fmt, multiline_ratio=0.1, seed=3))
+
+
+def _message_starts(lines: list, fmt: str) -> list:
+    prefix = "[" if fmt == "bracket" else "2023. "
+    return [i for i, line in enumerate(lines) if line.startswith(prefix)]
+
+
+def _encode(lines: list, saved_at: str = None) -> bytes:
+    lines = list(lines)
+    if saved_at is not None:
+        # 다시 내보내면 헤더의 저장 날짜가 바뀜
+        lines[1] = f"저장한 날짜 : {saved_at}"
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _assert_same_state(state: dict, expected: dict) -> None:
+    pd.testing.assert_frame_equal(state["features"], expected["features"])
+    assert state["n_records"] == expected["n_records"]
+    assert state["day"] == expected["day"]
+    assert state_results(state) == state_results(expected)
+
+
+@pytest.mark.parametrize("fmt", CHAT_FORMATS)
+@pytest.mark.parametrize("cut", [0.3, 0.7])
+def test_incremental_matches_full_rebuild(tmp_path, fmt, cut):
+    lines = _lines(fmt)
+    starts = _message_starts(lines, fmt)
+    k = starts[int(len(starts) * cut)]
+
+    old = build_chat_state(_encode(lines[:k]))
+    # 저장 → 불러오기를 거친 상태로 갱신 (JSON 왕복 후에도 같은 값)
+    save_chat_state(old, tmp_path / "state.json")
+    old = load_chat_state(tmp_path / "state.json")
+
+    new_export = _encode(lines, saved_at="2024-02-01 10:00:00")
+    state, mode = update_chat_state(old, new_export)
+
+    assert mode == "incremental"
+    _assert_same_state(state, build_chat_state(new_export))
+
+
+def test_tail_continuing_last_message_falls_back_to_full():
+    lines = _lines("export")
+    starts = _message_starts(lines, "export")
+    # 지난번 마지막 메시지 뒤에 헤더 없는 줄이 붙은 경우
+    k = starts[len(starts) // 2]
+    lines = lines[:k] + ["이어지는 줄"] + lines[k:]
+
+    old = build_chat_state(_encode(lines[:k]))
+    new_export = _encode(lines)
+    state, mode = update_chat_state(old, new_export)
+
+    assert mode == "full"
+    _assert_same_state(state, build_chat_state(new_export))
+
+
+def test_unrelated_export_falls_back_to_full():
+    old = build_chat_state(_encode(_lines("export")))
+    other = _encode(list(generate_chat_lines(2000, n_speakers=3, seed=99)))
+
+    state, mode = update_chat_state(old, other)
+
+    assert mode == "full"
+    _assert_same_state(state, build_chat_state(other))
+
+
+def test_changed_rules_fall_back_to_full(monkeypatch):
+    lines = _lines("export")
+    starts = _message_starts(lines, "export")
+    old = build_chat_state(_encode(lines[:starts[len(starts) // 2]]))
+
+    # 규칙 파일 / 감정 사전이 바뀐 것처럼 지문만 바꿈
+    monkeypatch.setattr(incremental, "feature_fingerprint", lambda: "changed")
+    state, mode = update_chat_state(old, _encode(lines))
+
+    assert mode == "full"
+    assert state["features_version"] == "changed"
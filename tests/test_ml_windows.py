@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis import parse_kakao_chat
+from analysis_ml import predict_mbti_ml_windows, time_order, window_bounds
+from synthetic_chat import generate_chat_lines
+
+
+def _bracket_chat_with_undated_head() -> pd.DataFrame:
+    # 첫 날짜 구분선 전의 대괄호 메시지는 datetime 이 NaT
+    lines = list(generate_chat_lines(1500, n_speakers=3, fmt="bracket", seed=1))
+    head = ["[사용자1] [오전 8:00] 날짜 전 메시지", "[사용자2] [오전 8:01] 하나 더"]
+    raw = "\n".join(lines[:3] + head + lines[3:]) + "\n"
+    return parse_kakao_chat(raw.encode("utf-8"), my_name="")
+
+
+def test_time_order_drops_nat_and_sorts():
+    times = pd.to_datetime(["2023-01-03", None, "2023-01-01", "2023-01-02", "2023-01-01"])
+    np.testing.assert_array_equal(time_order(times), [2, 4, 3, 0])
+
+
+def test_window_bounds_rejects_nat_and_unsorted():
+    with pytest.raises(ValueError):
+        window_bounds(2, timestamps=pd.to_datetime([None, "2023-01-01"]), window_time="1D")
+    with pytest.raises(ValueError):
+        window_bounds(2, timestamps=pd.to_datetime(["2023-01-02", "2023-01-01"]), window_time="1D")
+
+
+def test_time_windows_skip_undated_messages():
+    df = _bracket_chat_with_undated_head()
+    undated = int(df["datetime"].isna().sum())
+    assert undated == 2
+
+    result = predict_mbti_ml_windows(df["message"].tolist(), timestamps=df["datetime"], window_time="7D")
+    dated = df[df["datetime"].notna()].reset_index(drop=True)
+    expected = predict_mbti_ml_windows(dated["message"].tolist(), timestamps=dated["datetime"], window_time="7D")
+
+    assert len(result["windows"]) == len(expected["windows"]) > 0
+    for got, want in zip(result["windows"], expected["windows"]):
+        # 구간 위치는 원래 행 위치 (앞의 NaT 행만큼 밀림)
+        assert (got["start"], got["end"]) == (want["start"] + undated, want["end"] + undated)
+        assert got["proba"] == want["proba"]
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from numpy_inference import NumpyModel, predict_mbti_numpy
+from train_mbti_model import build_reference_model, export_numpy_arrays, load_dataset
+
+# 학습 문장 + 사전에 없는 단어 / 대문자 / 빈 문장 / 여러 문장을 합친 긴 문자열
+EXTRA_TEXTS = ["", "처음 보는 단어만 있음", "LOGIC 논리 PLAN", "ㅋㅋㅋ 미래 계획 정리 " * 20]
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    df = load_dataset()
+    return df["text"].astype(str).tolist(), df["mbti"].astype(str).tolist()
+
+
+def _export_roundtrip(tmp_path, vectorizer, model) -> NumpyModel:
+    # npz 로 저장 → 다시 읽은 모델로 비교 (저장 형식까지 확인)
+    path = tmp_path / "model.npz"
+    np.savez(path, **export_numpy_arrays(vectorizer, model))
+    return NumpyModel.load(path)
+
+
+def test_reference_model_parity(tmp_path, dataset):
+    texts, labels = dataset
+    vectorizer, model = build_reference_model()
+    model.fit(vectorizer.fit_transform(texts), labels)
+
+    numpy_model = _export_roundtrip(tmp_path, vectorizer, model)
+    samples = texts[:200] + EXTRA_TEXTS
+
+    assert list(numpy_model.classes_) == list(model.classes_)
+    np.testing.assert_allclose(
+        numpy_model.predict_proba(samples),
+        model.predict_proba(vectorizer.transform(samples)),
+        rtol=0, atol=1e-12,
+    )
+
+
+@pytest.mark.parametrize(
+    "vectorizer_params",
+    [
+        {"ngram_range": (1, 1)},
+        {"ngram_range": (2, 3), "sublinear_tf": True},
+        {"norm": "l1", "lowercase": False},
+        {"use_idf": False, "norm": None},
+    ],
+)
+def test_vectorizer_variants_parity(tmp_path, dataset, vectorizer_params):
+    texts, labels = dataset
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    model = LogisticRegression(max_iter=1000)
+    model.fit(vectorizer.fit_transform(texts), labels)
+
+    numpy_model = _export_roundtrip(tmp_path, vectorizer, model)
+    samples = texts[:100] + EXTRA_TEXTS
+
+    np.testing.assert_allclose(
+        numpy_model.predict_proba(samples),
+        model.predict_proba(vectorizer.transform(samples)),
+        rtol=0, atol=1e-12,
+    )
+
+
+def test_binary_model_parity(tmp_path, dataset):
+    # 클래스가 두 개면 coef 가 한 줄 → sigmoid
+    texts, labels = dataset
+    axis = [label[0] for label in labels]
+    vectorizer, model = build_reference_model()
+    model.fit(vectorizer.fit_transform(texts), axis)
+
+    numpy_model = _export_roundtrip(tmp_path, vectorizer, model)
+    samples = texts[:100] + EXTRA_TEXTS
+
+    np.testing.assert_allclose(
+        numpy_model.predict_proba(samples),
+        model.predict_proba(vectorizer.transform(samples)),
+        rtol=0, atol=1e-12,
+    )
+
+
+def test_predict_mbti_numpy_matches_sklearn(tmp_path, dataset):
+    texts, labels = dataset
+    vectorizer, model = build_reference_model()
+    model.fit(vectorizer.fit_transform(texts), labels)
+    path = tmp_path / "model.npz"
+    np.savez(path, **export_numpy_arrays(vectorizer, model))
+
+    messages = texts[:30]
+    proba = model.predict_proba(vectorizer.transform([" ".join(messages)]))[0]
+    result = predict_mbti_numpy(messages, path=path)
+
+    assert result["mbti"] == model.classes_[proba.argmax()]
+    assert result["confidence"] == round(float(proba.max()), 3)
+
+
+@pytest.mark.parametrize(
+    "vectorizer_params",
+    [{"analyzer": "char"}, {"binary": True}, {"stop_words": ["그리고", "그래서"]}],
+)
+def test_export_rejects_unsupported_settings(dataset, vectorizer_params):
+    # NumPy 추론이 따라 하지 않는 설정은 조용히 내보내지 않고 거부
+    texts, labels = dataset
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+
+    with pytest.raises(ValueError):
+        export_numpy_arrays(vectorizer, model)
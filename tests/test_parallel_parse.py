@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+from analysis import parse_kakao_chat, parse_kakao_chat_parallel
+from synthetic_chat import CHAT_FORMATS, generate_chat_lines
+
+
+def _export(fmt: str, newline: str = "\n", n_lines: int = 3000, emoji_ratio: float = 0.1) -> str:
+    # 여러 줄 메시지를 넉넉히 섞어서 청크 경계가 메시지 중간에 걸리도록
+    lines = generate_chat_lines(
+        n_lines, n_speakers=4, fmt=fmt, multiline_ratio=0.2, emoji_ratio=emoji_ratio, seed=7
+    )
+    return newline.join(lines) + newline
+
+
+@pytest.mark.parametrize("fmt", CHAT_FORMATS)
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_parallel_matches_serial(tmp_path, fmt, newline):
+    path = tmp_path / "chat.txt"
+    path.write_bytes(_export(fmt, newline).encode("utf-8"))
+
+    serial = parse_kakao_chat(path, my_name="")
+    parallel = parse_kakao_chat_parallel(path, workers=2, chunk_size=4096)
+
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+@pytest.mark.parametrize("encoding", ["utf-8-sig", "cp949"])
+def test_parallel_matches_serial_bytes(encoding):
+    # CP949 는 이모지를 표현할 수 없으므로 이모지 없이
+    raw = _export("export", emoji_ratio=0.0).encode(encoding)
+
+    serial = parse_kakao_chat(raw, my_name="")
+    parallel = parse_kakao_chat_parallel(raw, workers=2, chunk_size=2048)
+
+    assert set(serial["speaker"]) == {f"사용자{i}" for i in range(1, 5)}
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_parallel_single_chunk_and_empty():
+    raw = _export("bracket", n_lines=50).encode("utf-8")
+    pd.testing.assert_frame_equal(parse_kakao_chat_parallel(raw, workers=2), parse_kakao_chat(raw, my_name=""))
+    pd.testing.assert_frame_equal(parse_kakao_chat_parallel(b"", workers=2), parse_kakao_chat(b"", my_name=""))
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+def test_parallel_accepts_text_file_object(tmp_path, newline):
+    path = tmp_path / "chat.txt"
+    path.write_bytes(_export("export", newline).encode("utf-8"))
+
+    with open(path, "r", encoding="utf-8") as f:
+        serial = parse_kakao_chat(f, my_name="")
+    with open(path, "r", encoding="utf-8") as f:
+        parallel = parse_kakao_chat_parallel(f, workers=2, chunk_size=4096)
+    with open(path, "rb") as f:
+        binary = parse_kakao_chat_parallel(f, workers=2, chunk_size=4096)
+
+    assert len(serial) > 0
+    pd.testing.assert_frame_equal(parallel, serial)
+    pd.testing.assert_frame_equal(binary, serial)
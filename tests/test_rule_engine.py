@@ -0,0 +1,111 @@
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from analysis import estimate_mbti
+from features import extract_features, mbti_from_features
+from rule_engine import MbtiRuleEngine, load_rule_engine
+
+WORDS = [
+    "상상", "미래", "가능성", "느낌", "논리", "근거", "이성적", "계획", "정리", "일정",
+    "오늘", "밥", "먹자", "ㅋㅋ", "진짜", "그래", "알겠어", "내일", "보자", "응",
+]
+
+
+def legacy_estimate_mbti(df: pd.DataFrame) -> dict:
+    """
+    규칙 파일 도입 전 estimate_mbti (메시지를 공백으로 합쳐서 정규식 검색)
+    """
+    messages = df["message"].astype(str)
+    text = " ".join(messages)
+    score = {"I": 0, "E": 0, "N": 0, "S": 0, "T": 0, "F": 0, "J": 0, "P": 0}
+
+    if len(text) / max(len(messages), 1) > 15:
+        score["E"] += 1
+    else:
+        score["I"] += 1
+    if re.search(r"상상|미래|가능성|느낌", text):
+        score["N"] += 1
+    else:
+        score["S"] += 1
+    if re.search(r"논리|근거|이성적", text):
+        score["T"] += 1
+    else:
+        score["F"] += 1
+    if re.search(r"계획|정리|일정", text):
+        score["J"] += 1
+    else:
+        score["P"] += 1
+
+    mbti = (
+        ("E" if score["E"] >= score["I"] else "I")
+        + ("N" if score["N"] >= score["S"] else "S")
+        + ("T" if score["T"] >= score["F"] else "F")
+        + ("J" if score["J"] >= score["P"] else "P")
+    )
+    return {"mbti": mbti, "detail_score": score}
+
+
+def _random_chats(n_chats: int = 300, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n_chats):
+        # 키워드 밀도 / 문장 길이를 바꿔 가며 (평균 길이 기준 15 양쪽 모두 나오도록)
+        words = rng.sample(WORDS, rng.randint(1, len(WORDS)))
+        n_messages = rng.randint(0, 30)
+        max_words = rng.randint(1, 8)
+        yield [" ".join(rng.choice(words) for _ in range(rng.randint(1, max_words))) for _ in range(n_messages)]
+
+
+def test_shipped_rules_match_legacy_estimate():
+    mbti_types = set()
+    for messages in _random_chats():
+        df = pd.DataFrame({"message": messages, "speaker": ["a"] * len(messages)})
+        expected = legacy_estimate_mbti(df)
+
+        assert estimate_mbti(df) == expected
+        if messages:
+            assert mbti_from_features(extract_features(df["message"]).iloc[0]) == expected
+        mbti_types.add(expected["mbti"])
+
+    # 무작위 입력이 여러 판정을 골고루 거쳤는지
+    assert len(mbti_types) >= 8
+
+
+def test_letter_hits_counts_every_occurrence():
+    engine = load_rule_engine()
+    assert engine.letter_hits("미래 계획 미래 상상") == {"N": 3.0, "J": 1.0}
+    assert engine.letter_hits("아무 말") == {}
+
+
+def test_weighted_scoring_and_default():
+    engine = MbtiRuleEngine({
+        "axes": [
+            {"letters": ["E", "I"], "type": "avg_length", "threshold": 3},
+            {"letters": ["N", "S"], "type": "keywords", "scoring": "weighted", "default": "S"},
+            {"letters": ["T", "F"], "type": "keywords", "scoring": "presence", "default": "F"},
+            {"letters": ["J", "P"], "type": "keywords", "default": "P"},
+        ],
+        "rules": [
+            {"letter": "N", "keyword": "꿈", "weight": 2},
+            {"letter": "S", "keyword": "사실", "weight": 1},
+            {"letter": "T", "keyword": "왜", "weight": 5},
+            {"letter": "F", "keyword": "마음"},
+        ],
+    })
+
+    result = engine.score_messages(["꿈 사실 사실 사실", "왜 마음"])
+    # N 2 < S 3 (weighted), T / F 둘 다 나옴 → 같으면 앞 글자, J/P 는 키워드 없음 → default
+    assert result["mbti"] == "ESTP"
+    assert result["detail_score"]["N"] == 2.0 and result["detail_score"]["S"] == 3.0
+    assert result["detail_score"]["T"] == 1 and result["detail_score"]["F"] == 1
+
+
+def test_invalid_rules_rejected():
+    with pytest.raises(ValueError):
+        MbtiRuleEngine({"axes": [], "rules": [{"letter": "X", "keyword": "a"}]})
+
+    engine = MbtiRuleEngine({"axes": [{"letters": ["E", "I"], "type": "unknown"}], "rules": []})
+    with pytest.raises(ValueError):
+        engine.score(1, 1, {})
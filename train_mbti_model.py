@@ -1,14 +1,53 @@
+import argparse
+import itertools
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import StratifiedKFold, train_test_split
 import joblib
 from pathlib import Path
 
+from compact_model import COMPACT_MODEL_PATH, CompactModel
+from numpy_inference import NUMPY_MODEL_PATH, NumpyModel
+
 
 DATA_PATH = Path("data/kakao_mbti_dataset.csv")
 MODEL_PATH = Path("models/mbti_model.joblib")
 
+# 교차 검증 탐색 설정 (vectorizer 설정마다 fold 별 특징 행렬을 한 번만 만들고 분류기 설정끼리 공유)
+SEARCH_RESULTS_PATH = Path("models/search_results.csv")
+SEARCH_VECTORIZER_GRID = {
+    "max_features": [2000, 5000],
+    "ngram_range": [(1, 1), (1, 2)],
+    "min_df": [1, 2],
+}
+SEARCH_MODEL_GRID = {
+    "C": [0.25, 1.0, 4.0],
+    "class_weight": ["balanced", None],
+}
+
+# 스트리밍 학습 설정 (CSV 를 chunk 단위로 읽어서 partial_fit)
+STREAM_MODEL_PATH = Path("models/mbti_model_stream.joblib")
+STREAM_CHECKPOINT_PATH = Path("models/mbti_stream_checkpoint.joblib")
+STREAM_CHUNK_ROWS = 10_000
+STREAM_VECTORIZER_PARAMS = {"n_features": 2 ** 18, "ngram_range": (1, 2), "alternate_sign": False, "norm": "l2"}
+MBTI_TYPES = sorted(a + b + c + d for a, b, c, d in itertools.product("EI", "NS", "TF", "JP"))
+
+# 축별 이진 모델 (E/I, N/S, T/F, J/P 각각 LogisticRegression, 특징 행렬은 공유)
+AXIS_MODEL_PATH = Path("models/mbti_model_axes.joblib")
+MBTI_AXES = ["EI", "NS", "TF", "JP"]
+
+# 압축 모델 설정 (해시 버킷 수 / 계수 양자화)
+COMPACT_N_FEATURES = 2 ** 18
+COMPACT_NGRAM_RANGE = (1, 2)
+
 
 def load_dataset():
     df = pd.read_csv(DATA_PATH)
@@ -20,25 +59,51 @@ def load_dataset():
     return df
 
 
+def _save_atomic(obj, path: Path):
+    # 임시 파일에 쓴 뒤 rename
+    # - 학습 도중 중단되더라도 반쯤 쓴 파일이 남지 않음
+    # - ModelRegistry 가 mmap 으로 열어 둔 예전 파일은 그대로 남아 있어서 읽던 쪽이 깨지지 않음
+    #   (같은 파일을 덮어쓰면 매핑된 배열을 읽을 때 SIGBUS)
+    path.parent.mkdir(exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def build_model(vectorizer_params: dict, model_params: dict):
+    """
+    설정값으로 (vectorizer, model) 생성
+    """
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    model = LogisticRegression(max_iter=1000, **model_params)
+    return vectorizer, model
+
+
+def build_reference_model():
+    """
+    기본 MBTI 모델 설정의 (vectorizer, model)
+    """
+    return build_model(
+        {"max_features": 5000, "ngram_range": (1, 2), "min_df": 2},
+        {"class_weight": "balanced"},
+    )
+
+
 def train_model():
     df = load_dataset()
 
     X = df["text"].astype(str)
     y = df["mbti"].astype(str)
 
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        ngram_range=(1, 2),
-        min_df=2
-    )
+    vectorizer, model = build_reference_model()
 
     X_vec = vectorizer.fit_transform(X)
 
-    model = LogisticRegression(
-        max_iter=1000,
-        class_weight="balanced"
-    )
-
     model.fit(X_vec, y)
 
     bundle = {
@@ -46,12 +111,553 @@ def train_model():
         "model": model
     }
 
-    MODEL_PATH.parent.mkdir(exist_ok=True)
-    joblib.dump(bundle, MODEL_PATH)
+    _save_atomic(bundle, MODEL_PATH)
 
     print("✅ MBTI 모델 학습 완료!")
     print(f"저장 경로: {MODEL_PATH}")
 
 
+# -----------------------------
+# 교차 검증 하이퍼파라미터 탐색
+# -----------------------------
+def expand_grid(grid: dict) -> list:
+    """
+    {"a": [1, 2], "b": [3]} → [{"a": 1, "b": 3}, {"a": 2, "b": 3}]
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+_SEARCH_DATA = {}
+
+
+def _init_search_worker(texts, labels):
+    # 작업마다 데이터를 다시 보내지 않도록 프로세스당 한 번만 받아 둠
+    _SEARCH_DATA["texts"] = texts
+    _SEARCH_DATA["labels"] = labels
+
+
+def _search_task(task) -> list:
+    """
+    (vectorizer 설정, fold) 하나: 특징 행렬을 한 번 만들고 모든 분류기 설정을 학습 / 평가
+    """
+    vectorizer_params, fold, train_idx, test_idx, model_grid = task
+    texts, labels = _SEARCH_DATA["texts"], _SEARCH_DATA["labels"]
+
+    started = time.perf_counter()
+    vectorizer = TfidfVectorizer(**vectorizer_params)
+    X_train = vectorizer.fit_transform(texts[train_idx])
+    X_test = vectorizer.transform(texts[test_idx])
+    vectorize_sec = time.perf_counter() - started
+
+    rows = []
+    for model_params in model_grid:
+        started = time.perf_counter()
+        _, model = build_model(vectorizer_params, model_params)
+        model.fit(X_train, labels[train_idx])
+        accuracy = float((model.predict(X_test) == labels[test_idx]).mean())
+        rows.append({
+            "vectorizer": json.dumps(vectorizer_params),
+            "model": json.dumps(model_params),
+            "fold": fold,
+            "accuracy": accuracy,
+            "vectorize_sec": round(vectorize_sec, 4),
+            "fit_sec": round(time.perf_counter() - started, 4),
+        })
+    return rows
+
+
+def search_model(
+    folds: int = 5,
+    workers: int = None,
+    vectorizer_grid: dict = SEARCH_VECTORIZER_GRID,
+    model_grid: dict = SEARCH_MODEL_GRID,
+    results_path: Path = SEARCH_RESULTS_PATH,
+    model_path: Path = MODEL_PATH,
+) -> pd.DataFrame:
+    """
+    k-fold 교차 검증으로 vectorizer × 분류기 설정 조합을 프로세스 풀에서 평가
+    - fold 별 정확도 / 시간을 results_path (CSV) 에 기록
+    - 평균 정확도가 가장 높은 설정으로 전체 데이터를 다시 학습해서 model_path 에 저장
+    """
+    df = load_dataset()
+    texts = df["text"].astype(str).to_numpy()
+    labels = df["mbti"].astype(str).to_numpy()
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    splits = list(splitter.split(texts, labels))
+    vectorizer_settings = expand_grid(vectorizer_grid)
+    model_settings = expand_grid(model_grid)
+    tasks = [
+        (vectorizer_params, fold, train_idx, test_idx, model_settings)
+        for vectorizer_params in vectorizer_settings
+        for fold, (train_idx, test_idx) in enumerate(splits)
+    ]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker, initargs=(texts, labels)) as pool:
+        results = pd.DataFrame([row for rows in pool.map(_search_task, tasks) for row in rows])
+    elapsed = time.perf_counter() - started
+
+    results_path.parent.mkdir(exist_ok=True)
+    results.to_csv(results_path, index=False)
+
+    summary = (
+        results.groupby(["vectorizer", "model"], sort=False)
+        .agg(mean_accuracy=("accuracy", "mean"), std_accuracy=("accuracy", "std"), fit_sec=("fit_sec", "sum"))
+        .sort_values("mean_accuracy", ascending=False)
+    )
+    print(summary.head(10).to_string())
+    print(f"설정 {len(summary)}개 × fold {folds}개 평가 ({elapsed:.1f}초), 결과: {results_path}")
+
+    best_vectorizer, best_model = summary.index[0]
+    # CSV 용 JSON 문자열 → 원래 설정 dict (ngram_range 튜플 유지)
+    vectorizer_params = {json.dumps(params): params for params in vectorizer_settings}[best_vectorizer]
+    model_params = {json.dumps(params): params for params in model_settings}[best_model]
+    vectorizer, model = build_model(vectorizer_params, model_params)
+    model.fit(vectorizer.fit_transform(texts), labels)
+
+    _save_atomic({"vectorizer": vectorizer, "model": model}, model_path)
+
+    print("✅ 최적 설정으로 MBTI 모델 학습 완료!")
+    print(f"vectorizer={best_vectorizer} model={best_model}")
+    print(f"저장 경로: {model_path}")
+    return results
+
+
+# -----------------------------
+# 스트리밍 (out-of-core) 학습
+# -----------------------------
+def iter_dataset_chunks(path: Path = DATA_PATH, chunk_rows: int = STREAM_CHUNK_ROWS, skip_rows: int = 0):
+    """
+    CSV 를 chunk_rows 행씩 (text, mbti) 로 읽기 (앞의 skip_rows 행은 건너뜀)
+    """
+    reader = pd.read_csv(path, chunksize=chunk_rows, skiprows=range(1, skip_rows + 1))
+    for chunk in reader:
+        if not {"text", "mbti"}.issubset(chunk.columns):
+            raise ValueError("CSV에 'text'와 'mbti' 컬럼이 필요합니다.")
+
+        labels = chunk["mbti"].astype(str).str.upper()
+        unknown = set(labels) - set(MBTI_TYPES)
+        if unknown:
+            raise ValueError(f"알 수 없는 MBTI 라벨입니다: {sorted(unknown)}")
+
+        yield chunk["text"].astype(str), labels
+
+
+def _partial_fit_file(checkpoint: dict, data_path: Path, chunk_rows: int, checkpoint_path: Path):
+    """
+    checkpoint 의 epoch / rows_done 위치부터 epochs 회 학습하면서 chunk 마다 체크포인트 저장
+    """
+    vectorizer = HashingVectorizer(**checkpoint["vectorizer_params"])
+    model = checkpoint["model"]
+
+    while checkpoint["epoch"] < checkpoint["epochs"]:
+        for texts, labels in iter_dataset_chunks(data_path, chunk_rows, skip_rows=checkpoint["rows_done"]):
+            model.partial_fit(vectorizer.transform(texts), labels, classes=MBTI_TYPES)
+            checkpoint["rows_done"] += len(labels)
+            checkpoint["rows_seen"] += len(labels)
+            _save_atomic(checkpoint, checkpoint_path)
+            print(f"epoch {checkpoint['epoch'] + 1}/{checkpoint['epochs']}: {checkpoint['rows_done']}행")
+
+        checkpoint["epoch"] += 1
+        checkpoint["rows_done"] = 0
+        _save_atomic(checkpoint, checkpoint_path)
+
+    return vectorizer, model
+
+
+def train_stream_model(
+    data_path: Path = DATA_PATH,
+    epochs: int = 5,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    resume: bool = False,
+    checkpoint_path: Path = STREAM_CHECKPOINT_PATH,
+    model_path: Path = STREAM_MODEL_PATH,
+):
+    """
+    메모리에 다 올리지 않고 HashingVectorizer + SGDClassifier(partial_fit) 로 학습
+    - resume=True 면 체크포인트의 epoch / 행 위치부터 이어서 학습
+    - 결과 bundle 은 기존 모델과 같은 {"vectorizer", "model"} 형태
+    """
+    if resume:
+        checkpoint = joblib.load(checkpoint_path)
+        data_path = Path(checkpoint["data_path"])
+        print(f"체크포인트에서 이어서 학습: epoch {checkpoint['epoch'] + 1}, {checkpoint['rows_done']}행부터")
+    else:
+        checkpoint = {
+            "vectorizer_params": STREAM_VECTORIZER_PARAMS,
+            "model": SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42),
+            "data_path": str(data_path),
+            "epochs": epochs,
+            "epoch": 0,
+            "rows_done": 0,
+            "rows_seen": 0,
+        }
+
+    vectorizer, model = _partial_fit_file(checkpoint, data_path, chunk_rows, checkpoint_path)
+
+    _save_atomic({"vectorizer": vectorizer, "model": model}, model_path)
+
+    print("✅ 스트리밍 MBTI 모델 학습 완료!")
+    print(f"저장 경로: {model_path} (누적 {checkpoint['rows_seen']}행)")
+
+
+def append_stream_model(
+    data_path: Path,
+    epochs: int = 1,
+    chunk_rows: int = STREAM_CHUNK_ROWS,
+    checkpoint_path: Path = STREAM_CHECKPOINT_PATH,
+    model_path: Path = STREAM_MODEL_PATH,
+):
+    """
+    학습이 끝난 체크포인트에 새 라벨 데이터(data_path)만 추가로 학습
+    """
+    checkpoint = joblib.load(checkpoint_path)
+    if checkpoint["epoch"] < checkpoint["epochs"]:
+        raise ValueError("학습이 끝나지 않은 체크포인트입니다. --resume 으로 먼저 이어서 학습하세요.")
+
+    checkpoint.update({"data_path": str(data_path), "epochs": epochs, "epoch": 0, "rows_done": 0})
+    vectorizer, model = _partial_fit_file(checkpoint, data_path, chunk_rows, checkpoint_path)
+
+    _save_atomic({"vectorizer": vectorizer, "model": model}, model_path)
+
+    print("✅ 새 데이터 추가 학습 완료!")
+    print(f"저장 경로: {model_path} (누적 {checkpoint['rows_seen']}행)")
+
+
+# -----------------------------
+# 축별 이진 모델
+# -----------------------------
+def fit_axis_model(texts, labels) -> dict:
+    """
+    기본 vectorizer 로 특징 행렬을 한 번 만들고 축마다 이진 LogisticRegression 학습
+    반환 bundle: {"vectorizer", "axes": ["EI", ...], "positive": 축별 양성 글자,
+                  "coef": [4 × 특징 수], "intercept": [4]}
+    """
+    vectorizer, _ = build_reference_model()
+    X = vectorizer.fit_transform(texts)
+    labels = pd.Series(labels).astype(str).str.upper()
+
+    positive, coef, intercept = [], [], []
+    for i, axis in enumerate(MBTI_AXES):
+        _, model = build_reference_model()
+        model.fit(X, labels.str[i])
+        if list(model.classes_) != sorted(axis):
+            raise ValueError(f"{axis} 축 라벨에 두 글자가 모두 있어야 합니다: {list(model.classes_)}")
+        positive.append(str(model.classes_[1]))
+        coef.append(model.coef_[0])
+        intercept.append(model.intercept_[0])
+
+    return {
+        "vectorizer": vectorizer,
+        "axes": list(MBTI_AXES),
+        "positive": positive,
+        "coef": np.vstack(coef),
+        "intercept": np.asarray(intercept),
+    }
+
+
+def train_axis_model(path: Path = AXIS_MODEL_PATH):
+    df = load_dataset()
+    bundle = fit_axis_model(df["text"].astype(str), df["mbti"].astype(str))
+
+    _save_atomic(bundle, path)
+
+    print("✅ 축별 MBTI 모델 학습 완료!")
+    print(f"저장 경로: {path}")
+
+
+def _median_ms(fn, repeat: int = 50) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return round(float(np.median(times)) * 1000, 3)
+
+
+def benchmark_axis_model(test_size: float = 0.2) -> dict:
+    """
+    같은 학습/검증 분할에서 16클래스 모델과 축별 모델의 정확도 / 학습 시간 / 추론 지연 비교
+    - type_accuracy: 4글자 전체 일치, axis_accuracy: 축별 글자 일치 평균
+    """
+    from analysis_ml import axis_proba
+
+    df = load_dataset()
+    X_train, X_test, y_train, y_test = train_test_split(
+        df["text"].astype(str), df["mbti"].astype(str),
+        test_size=test_size, random_state=42, stratify=df["mbti"],
+    )
+    y_test = y_test.to_numpy()
+    sample = [" ".join(X_test)]
+
+    def letter_accuracy(pred):
+        return round(float(np.mean([(pred.str[i] == pd.Series(y_test).str[i]).mean() for i in range(4)])), 4)
+
+    started = time.perf_counter()
+    vectorizer, model = build_reference_model()
+    model.fit(vectorizer.fit_transform(X_train), y_train)
+    ref_train = time.perf_counter() - started
+    ref_pred = pd.Series(model.predict(vectorizer.transform(X_test)))
+
+    started = time.perf_counter()
+    bundle = fit_axis_model(X_train, y_train)
+    axis_train = time.perf_counter() - started
+    _, letters = axis_proba(bundle, list(X_test))
+    axis_pred = pd.Series(letters)
+
+    report = {
+        "16-class": {
+            "type_accuracy": round(float((ref_pred == y_test).mean()), 4),
+            "axis_accuracy": letter_accuracy(ref_pred),
+            "train_s": round(ref_train, 3),
+            "predict_ms": _median_ms(lambda: model.predict_proba(vectorizer.transform(sample))),
+            "weights": int(model.coef_.size),
+        },
+        "4-axis": {
+            "type_accuracy": round(float((axis_pred == y_test).mean()), 4),
+            "axis_accuracy": letter_accuracy(axis_pred),
+            "train_s": round(axis_train, 3),
+            "predict_ms": _median_ms(lambda: axis_proba(bundle, sample)),
+            "weights": int(bundle["coef"].size),
+        },
+    }
+
+    columns = list(report["16-class"])
+    print(f"{'':>9} " + " ".join(f"{col:>14}" for col in columns))
+    for name, row in report.items():
+        print(f"{name:>9} " + " ".join(f"{row[col]:>14}" for col in columns))
+    return report
+
+
+# -----------------------------
+# 압축 모델 (해시 특징 + 양자화 계수)
+# -----------------------------
+def fit_compact_model(texts, labels, quantize: str = "int8") -> dict:
+    """
+    HashingVectorizer + IDF + LogisticRegression 을 학습해서 npz 로 저장할 배열 dict 반환
+    학습에 한 번이라도 나온 해시 버킷만 IDF / 계수 열을 저장
+    """
+    hasher = HashingVectorizer(
+        n_features=COMPACT_N_FEATURES,
+        ngram_range=COMPACT_NGRAM_RANGE,
+        alternate_sign=False,
+        norm=None,
+    )
+    counts = hasher.transform(texts)
+    tfidf = TfidfTransformer()
+    X_vec = tfidf.fit_transform(counts)
+
+    model = LogisticRegression(
+        max_iter=1000,
+        class_weight="balanced"
+    )
+    model.fit(X_vec, labels)
+
+    buckets = np.unique(counts.indices).astype(np.int32)
+    n_docs = counts.shape[0]
+
+    arrays = {
+        "n_features": np.int64(COMPACT_N_FEATURES),
+        "ngram_range": np.asarray(COMPACT_NGRAM_RANGE, dtype=np.int64),
+        "classes": model.classes_.astype(str),
+        "buckets": buckets,
+        "idf": tfidf.idf_[buckets].astype(np.float32),
+        # 학습에 없던 버킷의 IDF (smooth_idf: log((1 + n) / 1) + 1)
+        "idf_default": np.float32(np.log(1 + n_docs) + 1),
+        "intercept": model.intercept_.astype(np.float32),
+    }
+
+    coef = model.coef_[:, buckets]
+    if quantize == "int8":
+        scale = np.abs(coef).max(axis=1) / 127
+        scale[scale == 0] = 1.0
+        arrays["coef_q"] = np.round(coef / scale[:, None]).astype(np.int8)
+        arrays["coef_scale"] = scale.astype(np.float32)
+    else:
+        arrays["coef"] = coef.astype(np.float32)
+
+    return arrays
+
+
+def train_compact_model(quantize: str = "int8", path: Path = COMPACT_MODEL_PATH):
+    df = load_dataset()
+    arrays = fit_compact_model(df["text"].astype(str), df["mbti"].astype(str), quantize=quantize)
+
+    path.parent.mkdir(exist_ok=True)
+    np.savez(path, **arrays)
+
+    print("✅ 압축 MBTI 모델 학습 완료!")
+    print(f"저장 경로: {path}")
+
+
+def measure_load(load_fn, repeat: int = 5) -> dict:
+    """
+    로드 시간 (중앙값) 과 로드 중 할당된 메모리 최대치
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        load_fn()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    obj = load_fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+
+    return {"load_ms": round(float(np.median(times)) * 1000, 2), "load_peak_kb": round(peak / 1024, 1)}
+
+
+def evaluate_compact_model(tolerance: float = 0.02, quantize: str = "int8", test_size: float = 0.2) -> dict:
+    """
+    같은 학습/검증 분할에서 기존 모델과 압축 모델을 학습해서 비교
+    - 정확도 차이가 tolerance 를 넘으면 AssertionError
+    - 파일 크기 / 로드 시간 / 로드 메모리 비교 결과를 출력
+    """
+    df = load_dataset()
+    X_train, X_test, y_train, y_test = train_test_split(
+        df["text"].astype(str), df["mbti"].astype(str),
+        test_size=test_size, random_state=42, stratify=df["mbti"],
+    )
+
+    vectorizer, model = build_reference_model()
+    model.fit(vectorizer.fit_transform(X_train), y_train)
+    ref_pred = model.predict(vectorizer.transform(X_test))
+    ref_acc = float((ref_pred == y_test.to_numpy()).mean())
+
+    # 정확도를 잰 배열을 그대로 저장해서 크기 / 로드 시간도 같은 모델로 측정
+    compact_arrays = fit_compact_model(X_train, y_train, quantize=quantize)
+    compact = CompactModel(compact_arrays)
+    compact_pred = compact.classes_[compact.predict_proba(list(X_test)).argmax(axis=1)]
+    compact_acc = float((compact_pred == y_test.to_numpy()).mean())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ref_path = Path(tmp) / "reference.joblib"
+        compact_path = Path(tmp) / "compact.npz"
+        joblib.dump({"vectorizer": vectorizer, "model": model}, ref_path)
+        np.savez(compact_path, **compact_arrays)
+
+        report = {
+            "reference": {
+                "accuracy": round(ref_acc, 4),
+                "size_kb": round(os.path.getsize(ref_path) / 1024, 1),
+                **measure_load(lambda: joblib.load(ref_path)),
+            },
+            "compact": {
+                "accuracy": round(compact_acc, 4),
+                "size_kb": round(os.path.getsize(compact_path) / 1024, 1),
+                **measure_load(lambda: CompactModel.load(compact_path)),
+            },
+        }
+
+    print(f"{'':>10} {'accuracy':>9} {'size KB':>9} {'load ms':>9} {'load KB':>9}")
+    for name, row in report.items():
+        print(f"{name:>10} {row['accuracy']:>9} {row['size_kb']:>9} {row['load_ms']:>9} {row['load_peak_kb']:>9}")
+
+    diff = abs(compact_acc - ref_acc)
+    if diff > tolerance:
+        raise ValueError(f"압축 모델 정확도 차이 {diff:.4f} 가 허용치 {tolerance} 를 넘었습니다.")
+    print(f"✅ 정확도 차이 {diff:.4f} (허용치 {tolerance})")
+    return report
+
+
+# -----------------------------
+# NumPy 전용 추론용 내보내기
+# -----------------------------
+def export_numpy_arrays(vectorizer, model) -> dict:
+    """
+    학습된 TfidfVectorizer / LogisticRegression 을 numpy_inference 가 읽는 배열 dict 로 변환
+    """
+    if (
+        vectorizer.analyzer != "word"
+        or vectorizer.preprocessor is not None
+        or vectorizer.tokenizer is not None
+        or vectorizer.strip_accents is not None
+    ):
+        raise ValueError("NumPy 내보내기는 기본 word 분석기 설정의 TfidfVectorizer 만 지원합니다.")
+    # numpy_inference 는 횟수를 그대로 세고 불용어를 빼지 않으므로, 이 설정이면 확률이 달라짐
+    if vectorizer.binary or vectorizer.stop_words is not None:
+        raise ValueError("NumPy 내보내기는 binary=True / stop_words 설정의 TfidfVectorizer 를 지원하지 않습니다.")
+
+    return {
+        "terms": np.asarray(vectorizer.get_feature_names_out(), dtype=str),
+        "idf": (vectorizer.idf_ if vectorizer.use_idf else np.ones(len(vectorizer.vocabulary_))).astype(np.float64),
+        "coef": np.asarray(model.coef_, dtype=np.float64),
+        "intercept": np.asarray(model.intercept_, dtype=np.float64),
+        "classes": np.asarray(model.classes_, dtype=str),
+        "token_pattern": np.asarray(vectorizer.token_pattern),
+        "lowercase": np.asarray(vectorizer.lowercase),
+        "ngram_range": np.asarray(vectorizer.ngram_range),
+        "sublinear_tf": np.asarray(vectorizer.sublinear_tf),
+        "norm": np.asarray(vectorizer.norm or ""),
+    }
+
+
+def export_numpy_model(model_path: Path = MODEL_PATH, path: Path = NUMPY_MODEL_PATH, tolerance: float = 1e-9):
+    """
+    저장된 joblib 모델을 npz 로 내보내고, 학습 데이터로 predict_proba 결과가 같은지 확인
+    """
+    bundle = joblib.load(model_path)
+    vectorizer, model = bundle["vectorizer"], bundle["model"]
+
+    arrays = export_numpy_arrays(vectorizer, model)
+
+    texts = list(load_dataset()["text"].astype(str))
+    expected = model.predict_proba(vectorizer.transform(texts))
+    actual = NumpyModel(arrays).predict_proba(texts)
+    diff = float(np.abs(expected - actual).max())
+    if diff > tolerance:
+        raise ValueError(f"NumPy 추론 결과 차이 {diff:.2e} 가 허용치 {tolerance} 를 넘었습니다.")
+
+    path.parent.mkdir(exist_ok=True)
+    np.savez(path, **arrays)
+
+    print("✅ NumPy 추론용 모델 내보내기 완료!")
+    print(f"저장 경로: {path} (predict_proba 최대 차이 {diff:.2e})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MBTI 모델 학습")
+    parser.add_argument("--compact", action="store_true", help="해시 특징 + 양자화 계수 압축 모델 학습")
+    parser.add_argument("--quantize", choices=["int8", "float32"], default="int8")
+    parser.add_argument("--evaluate-compact", action="store_true", help="기존 모델과 압축 모델 정확도 / 크기 / 로드 비교")
+    parser.add_argument("--tolerance", type=float, default=0.02)
+    parser.add_argument("--search", action="store_true", help="k-fold 교차 검증으로 설정 탐색 후 최적 모델 저장")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--stream", action="store_true", help="CSV 를 chunk 단위로 읽어 partial_fit 으로 학습")
+    parser.add_argument("--resume", action="store_true", help="스트리밍 학습을 체크포인트부터 이어서 진행")
+    parser.add_argument("--append", type=Path, default=None, help="학습된 스트리밍 모델에 새 라벨 CSV 추가 학습")
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--epochs", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS)
+    parser.add_argument("--axes", action="store_true", help="E/I, N/S, T/F, J/P 축별 이진 모델 학습")
+    parser.add_argument("--benchmark-axes", action="store_true", help="16클래스 모델과 축별 모델 비교")
+    parser.add_argument("--export-numpy", action="store_true", help="저장된 모델을 NumPy 전용 추론용 npz 로 내보내기")
+    args = parser.parse_args()
+
+    if args.benchmark_axes:
+        benchmark_axis_model()
+    elif args.axes:
+        train_axis_model()
+    elif args.append is not None:
+        append_stream_model(args.append, epochs=args.epochs or 1, chunk_rows=args.chunk_rows)
+    elif args.stream or args.resume:
+        train_stream_model(args.data, epochs=args.epochs or 5, chunk_rows=args.chunk_rows, resume=args.resume)
+    elif args.search:
+        search_model(folds=args.folds, workers=args.workers)
+    elif args.export_numpy:
+        export_numpy_model()
+    elif args.evaluate_compact:
+        evaluate_compact_model(tolerance=args.tolerance, quantize=args.quantize)
+    elif args.compact:
+        train_compact_model(quantize=args.quantize)
+    else:
+        train_model()
+
+
 if __name__ == "__main__":
-    train_model()
+    main()